@@ -0,0 +1,54 @@
+"""
+Compare les tokens de prompt évalués par Ollama à chaque tour,
+selon le mode de session de Brain ("none" sans réutilisation, "prefix" ou "context").
+Les échanges sont journalisés dans un dossier à part, jamais dans logs/history.jsonl.
+Usage : python benchmark.py [--turns 6] [--sessions none prefix context] [--log-dir dossier]
+"""
+import argparse
+import tempfile
+from modules.voice import brain as brain_module
+from modules.voice.brain import Brain
+from modules.voice.history_log import HistoryLog
+
+PROMPTS = [
+    "Hello, who are you?",
+    "What can you do for me?",
+    "Tell me a fun fact about the moon.",
+    "And one about Mars.",
+    "Which of the two planets is bigger?",
+    "Summarize what we talked about.",
+    "Thank you, that will be all.",
+    "Can you remind me what the first fun fact was?",
+]
+
+
+def run(session, turns):
+    brain = Brain()
+    brain.session = session
+    brain.use_speaker = False
+    brain.use_logging = False
+    for prompt in PROMPTS[:turns]:
+        reply = brain.query_ollama(prompt)
+        if reply is None:
+            break
+        brain.update_history(prompt, brain.format_markdown(reply))
+    return brain.prompt_eval
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--sessions", nargs="+", default=["none", "prefix", "context"])
+    parser.add_argument("--log-dir", default=None)
+    args = parser.parse_args()
+
+    # Brain writes its session and turns to the shared log, keep them out of the real history
+    brain_module.history_log = HistoryLog(args.log_dir or tempfile.mkdtemp(prefix="athena-benchmark-"))
+
+    results = {session: run(session, args.turns) for session in args.sessions}
+
+    print("turn  " + "  ".join(f"{s:>8}" for s in args.sessions))
+    for turn in range(args.turns):
+        row = [str(results[s][turn]) if turn < len(results[s]) else "-" for s in args.sessions]
+        print(f"{turn + 1:>4}  " + "  ".join(f"{r:>8}" for r in row))
+    print("total " + "  ".join(f"{sum(results[s]):>8}" for s in args.sessions))
@@ -1,9 +1,18 @@
-
 import configparser
 import os
-import sys 
+import sys
 import __main__
-from PySide6.QtWidgets import QApplication
+from startup import profiler
+
+# python main.py --profile-startup : time every stage and import, then quit
+profile_startup = "--profile-startup" in sys.argv
+if profile_startup:
+    sys.argv.remove("--profile-startup")
+    profiler.enable()
+
+with profiler.stage("qt"):
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
 
 def resource_path(relative_path: str) -> str:
     try:
@@ -19,10 +28,24 @@ config.read(config_path)
 
 if config.get("General", "wizard", fallback=False) == "true":
     if config.get("Modules", "voice", fallback=False) == "true":
-        from modules.voice.listener import *
-        app = QApplication(sys.argv)
-        window = ListenerUI()
-        window.show()
+        # Only the window is loaded here, the rest loads once it is shown
+        with profiler.stage("window"):
+            from modules.voice.window import ListenerUI
+            app = QApplication(sys.argv)
+            window = ListenerUI()
+            window.show()
+
+        def loaded(success):
+            profiler.mark("loaded")
+            if profile_startup:
+                print(profiler.report())
+                app.quit()
+
+        def first_frame():
+            profiler.mark("first window")
+            window.preload(profiler, on_loaded=loaded)
+
+        QTimer.singleShot(0, first_frame)
         sys.exit(app.exec())
 
 else:
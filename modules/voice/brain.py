@@ -2,13 +2,20 @@ import json
 import os
 import re
 from .speaker import Speaker
+from .history import History
+from .router import Router
+from .executor import ActionExecutor
+from .response_cache import ResponseCache
+from .structured import StructuredReply
+from .history_log import HistoryLog
+from .tracing import tracer
 import configparser
 import ollama
 import textwrap
-from datetime import datetime
+import time
+import threading
 import sys
-sys.path.append(os.path.dirname(__file__))
-from .functions import *
+from .functions import functions_registry
 import locale
 import __main__
 
@@ -24,20 +31,48 @@ config_path = resource_path("settings/config.cfg")
 lang_dir = resource_path("lang")
 log_dir = resource_path("logs")
 actions_path = resource_path("settings/actions.json")
+apps_path = resource_path("settings/apps.json")
+cache_dir = resource_path("cache")
+# One writer for the whole process, Brain is created again at each start
+history_log = HistoryLog(log_dir)
+
+class Turn():
+    """
+    Un tour de conversation. Il est dépassé dès qu'une nouvelle commande arrive :
+    ce qu'il dit encore est jeté et la lecture d'Ollama s'arrête.
+    """
+
+    def __init__(self, brain):
+        self.brain = brain
+        self.generation = brain.generation
+        self.voice = brain.speaker.generation  # speaker generation pinned for the whole turn
+        self.utterance = tracer.current  # traced command this turn answers
+
+    def cancelled(self):
+        return self.brain.cancel or self.generation != self.brain.generation
+
+    def say(self, text, templated=False):
+        if not self.cancelled():
+            self.brain.speaker.say(text, generation=self.voice, templated=templated, utterance=self.utterance)
+
 
 class Brain():
     cancel = False
-    speaker = Speaker()
-    config = configparser.ConfigParser()
-    config.read(config_path)
-    name = config.get('General', 'username', fallback="").capitalize()
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "history.log")
-    lang_file = os.path.join(lang_dir, f"{config.get('General', 'lang', fallback='en_US')}.json")
-    with open(actions_path, 'r', encoding='utf-8') as f:
-        actions_file = json.load(f)
-        
+    speaker = None  # shared by every Brain, its worker outlives start/stop
+
     def __init__(self, log_signal=None):
+        if Brain.speaker is None:
+            Brain.speaker = Speaker()
+        self.config = configparser.ConfigParser()
+        self.config.read(config_path)
+        self.name = self.config.get('General', 'username', fallback="").capitalize()
+        os.makedirs(log_dir, exist_ok=True)
+        history_log.configure(self.config.getint("Voice", "history_log_mb", fallback=5) * 1024 * 1024)
+        self.lang_file = os.path.join(lang_dir, f"{self.config.get('General', 'lang', fallback='en_US')}.json")
+        with open(actions_path, 'r', encoding='utf-8') as f:
+            self.actions_file = json.load(f)
+        with open(apps_path, 'r', encoding='utf-8') as f:
+            self.apps_file = json.load(f)
         locale.setlocale(locale.LC_TIME, f'{self.config.get("General", "lang")}.UTF-8')
         self.log_signal = log_signal
         self.use_logging = False
@@ -48,8 +83,34 @@ class Brain():
         self.hotword = self.lang["hotword"]
         self.use_logging = self.config.getboolean("Voice", "logging", fallback=False)
         self.use_speaker = self.config.getboolean("Voice", "speaker", fallback=False)
+        self.use_stream = self.config.getboolean("Voice", "stream", fallback=True)
+        self.model = self.config.get("Voice", "model", fallback="gemma3n")
+        self.keep_alive = self.config.get("Voice", "keep_alive", fallback="30m")
+        self.client = ollama.Client(host=self.config.get("Voice", "ollama_host", fallback=None) or None)
+        self.session = self.config.get("Voice", "session", fallback="prefix")
+        self.context = None  # evaluated context returned by the generate API
+        self.prompt_eval = []  # prompt tokens evaluated per turn
+        self.spoken = ""  # streamed text already sent to the speaker
+        self.generation = 0  # bumped by interrupt(), older turns are superseded
         actions_str = self.config.get("Voice", "actions", fallback="")
         self.ALLOWED_ACTIONS = [a.strip() for a in actions_str.split(",")]
+        self.use_router = self.config.getboolean("Voice", "router", fallback=True)
+        self.router = Router(self.actions_file, self.apps_file, self.lang, self.ALLOWED_ACTIONS)
+        self.executor = ActionExecutor(self.execute, self.actions_file)
+        prewarm = [a.strip() for a in self.config.get("Voice", "prewarm", fallback="").split(",") if a.strip()]
+        functions_registry.prewarm(functions_registry.for_actions([a for a in prewarm if a in self.ALLOWED_ACTIONS]))
+        self.reply_format = self.config.get("Voice", "reply_format", fallback="text")
+        self.structured = StructuredReply(self.actions_file, self.ALLOWED_ACTIONS)
+        self.use_response_cache = self.config.getboolean("Voice", "response_cache", fallback=True)
+        self.responses = ResponseCache(
+            os.path.join(cache_dir, "responses.json"),
+            self.lang,
+            sources=[actions_path, apps_path],
+            enabled_actions=self.ALLOWED_ACTIONS,
+            reply_format=self.reply_format,
+            max_entries=self.config.getint("Voice", "response_cache_size", fallback=256),
+            ttl=self.config.getfloat("Voice", "response_cache_days", fallback=7) * 24 * 3600
+        )
         self.SYSTEM_PROMPT = textwrap.dedent(f"""
             You are an voice commanded AI assistant called {self.lang['hotword'].capitalize()}. 
             Your user is called {self.name} and speaks {self.lang['language']}.
@@ -58,57 +119,201 @@ class Brain():
         for action in self.ALLOWED_ACTIONS:
             self.SYSTEM_PROMPT += self.actions_file[action]["prompt"]
 
+        if self.reply_format == "json":
+            self.SYSTEM_PROMPT += "\n" + self.structured.instructions()
+        else:
+            self.SYSTEM_PROMPT += textwrap.dedent("""
+                If the user asks multiple actions at once, ONLY answer with :
+                ACTION: <action_1> ACTION: <action_2> ACTION: ...
+                """)
         self.SYSTEM_PROMPT += textwrap.dedent("""
-            If the user asks multiple actions at once, ONLY answer with :
-            ACTION: <action_1> ACTION: <action_2> ACTION: ...
             If the user asks for a taks you can't perform, explain you can't do it.
             Else, answer normaly and simply (one sentence or two).
             Don't use emojis.
             """)
-        self.conversation_history = [{"role": "system", "content": (self.SYSTEM_PROMPT)}]
-        with open(self.log_file, 'a') as f:
-            f.write(f"{datetime.now()} [NEW SESSIONS STARTED] \n")
+        self.history = History(
+            self.SYSTEM_PROMPT,
+            summarize=self.summarize,
+            budget=self.config.getint("Voice", "history_tokens", fallback=2048),
+            keep_turns=self.config.getint("Voice", "history_turns", fallback=4)
+        )
+        self.turn = None  # source, actions and timings of the current turn
+        history_log.write({"event": "session", "model": self.model, "session": self.session})
 
     # ---------------------- FUNCTIONS ----------------------
 
-    def update_history(self, prompt, response): 
+    def emit(self, message):
+        if self.log_signal:
+            self.log_signal.emit(message)
 
-        # add new info (from current session)
-        with open(self.log_file, 'a') as f:
-            f.write(f"{datetime.now()} PROMPT: {prompt} \n{datetime.now()} RESPONSE: {response} \n")
+    def warm_up(self):
+        """
+        Charge le modèle dans Ollama en arrière-plan et le garde en mémoire (keep_alive).
+        """
+        threading.Thread(target=self.load_model, daemon=True).start()
 
-        self.conversation_history.append({
-                "role": "user",
-                "content": prompt
-            })
-            
-        self.conversation_history.append({
-                "role": "assistant",
-                "content": response
-            })
+    def load_model(self):
+        self.emit(f"⏳ {self.lang['loading model']} {self.model}...")
+        start = time.perf_counter()
+        try:
+            # An empty prompt only loads the model
+            self.client.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+            self.emit(f"✅ {self.model} {self.lang['model ready']} ({time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            self.emit(f"❌ {self.lang['ollama error']} : {e}")
+
+    def release(self):
+        """
+        Rend la main à Ollama : le modèle sera déchargé après le délai habituel.
+        Ne bloque pas l'arrêt de l'écoute.
+        """
+        threading.Thread(target=self.release_model, daemon=True).start()
 
-    def query_ollama(self, prompt):
+    def model_loaded(self):
+        names = {self.model, f"{self.model}:latest"}
+        return any(m.model in names or m.name in names for m in self.client.ps().models)
+
+    def release_model(self):
         try:
-            self.conversation_history.append({"role": "user", "content": prompt})
-            
-            response = ollama.chat(
-                model="gemma3n",
-                messages=self.conversation_history,
-                stream=True
-            )
+            # Already evicted: a generate call would load it again just to set keep_alive
+            if self.model_loaded():
+                self.client.generate(model=self.model, prompt="", keep_alive=self.config.get("Voice", "release_keep_alive", fallback="5m"))
+        except Exception as e:
+            print(self.lang["ollama error"], e)
+        history_log.flush()
+
+    def update_history(self, prompt, response):
+        record = {"event": "turn", "prompt": prompt, "response": response}
+        if self.turn:
+            self.timing("total", self.turn.pop("start"))
+            record.update(self.turn)
+            self.turn = None
+        history_log.write(record)
+
+        self.history.add(prompt, response)
 
+    def timing(self, name, start):
+        # Milliseconds since start, kept for the history log
+        if self.turn:
+            self.turn["timings"][name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def summarize(self, text):
+        response = self.client.chat(
+            model=self.model,
+            keep_alive=self.keep_alive,
+            messages=[
+                {"role": "system", "content": "Summarize this conversation in a few short sentences. Keep names, apps and facts the user gave. Answer with the summary only."},
+                {"role": "user", "content": text}
+            ]
+        )
+        return response.message.content
+
+    def interrupt(self):
+        """
+        Une nouvelle commande arrive pendant que la précédente est traitée.
+        """
+        self.generation += 1
+
+    def query_ollama(self, prompt, on_sentence=None, turn=None):
+        """
+        Interroge Ollama. Si on_sentence est donné, chaque phrase complète
+        lui est passée dès qu'elle arrive (les ACTION sont retenues).
+        Retourne None si turn est dépassé avant la fin de la réponse.
+        """
+        try:
             full_response = ""
-            
-            for chunk in response:
-                if hasattr(chunk, "message") and hasattr(chunk.message, "content"):
-                    full_response += chunk.message.content
-            
+            self.spoken = ""
+            start = time.perf_counter()
+            first_token = None
+            evaluated = None
+            tracer.instant("llm request", "llm", tracer.current, session=self.session)
+
+            for content, stats in self.stream_reply(prompt):
+                if turn and turn.cancelled():
+                    # Closing the generator drops the HTTP stream
+                    return None
+                if content and first_token is None:
+                    first_token = time.perf_counter()
+                    tracer.span("llm first token", "llm", tracer.current, start, first_token)
+                full_response += content
+                if on_sentence:
+                    self.stream_sentences(full_response, on_sentence)
+                if stats:
+                    evaluated = stats
+                    self.prompt_eval.append(stats)
+                    if self.turn:
+                        self.turn["prompt_eval"] = stats
+
+            if first_token is not None:
+                tracer.span("llm generation", "llm", tracer.current, first_token)
+            tracer.span("llm", "llm", tracer.current, start, prompt_eval=evaluated)
             return full_response
 
         except Exception as e:
             print(self.lang["ollama error"], e)
             self.cancel = True
 
+    def stream_reply(self, prompt):
+        """
+        Génère (morceau de texte, tokens de prompt évalués ou None) selon le mode de session :
+        - "context" : API generate, on renvoie le contexte déjà évalué, seul le nouveau message est évalué,
+        - "prefix" : API chat, l'historique garde un début identique que le serveur réutilise,
+        - "none" : comme "prefix" mais sans réutilisation, tout est réévalué (référence du benchmark).
+        """
+        if self.session == "context":
+            system = None
+            if self.context is None or len(self.context) > self.history.budget:
+                # First turn or context too long: start again from the (summarized) history
+                self.context = None
+                system = self.history.transcript()
+            response = self.client.generate(
+                model=self.model,
+                keep_alive=self.keep_alive,
+                prompt=prompt,
+                system=system,
+                context=self.context,
+                format=self.reply_schema(),
+                stream=True
+            )
+            for chunk in response:
+                if chunk.done:
+                    self.context = chunk.context
+                yield chunk.response or "", chunk.prompt_eval_count if chunk.done else None
+            return
+
+        messages = self.history.messages()
+        if self.session == "none":
+            # A new first line each turn: the server can't reuse any cached prefix
+            messages[0] = dict(messages[0], content=f"{time.time_ns()}\n{messages[0]['content']}")
+        messages.append({"role": "user", "content": prompt})
+        response = self.client.chat(
+            model=self.model,
+            keep_alive=self.keep_alive,
+            messages=messages,
+            format=self.reply_schema(),
+            stream=True
+        )
+        for chunk in response:
+            content = ""
+            if hasattr(chunk, "message") and hasattr(chunk.message, "content"):
+                content = chunk.message.content or ""
+            yield content, chunk.prompt_eval_count if chunk.done else None
+
+    def reply_schema(self):
+        return self.structured.schema() if self.reply_format == "json" else None
+
+    def stream_sentences(self, text, on_sentence):
+        """
+        Envoie les phrases terminées pas encore prononcées, jusqu'à la première ACTION.
+        """
+        if "ACTION:" in text:
+            text = text[:text.index("ACTION:")]
+        pending = text[len(self.spoken):]
+        for match in re.finditer(r".*?(?:[.!?…]+\s+|\n+)", pending, re.DOTALL):
+            sentence = match.group(0)
+            self.spoken += sentence
+            on_sentence(self.format_markdown(sentence))
+
     def format_markdown(self, text: str) -> str:
         """
         Transforme *texte* en texte gras avec ANSI et enlève la date du message.
@@ -118,36 +323,141 @@ class Brain():
         return re.sub(r"\*(.*?)\*", r"\033[1m\1\033[0m", no_datetime_text)
 
     # ---------------------- MAIN LOOP ----------------------
+    def execute(self, action, params=""):
+        """
+        Exécute une action autorisée et retourne son résultat, ou None si elle n'existe pas.
+        """
+        start = time.perf_counter()
+        try:
+            return self.call_function(action, params)
+        finally:
+            tracer.span(f"action {action}", "actions", tracer.current, start, params=params)
+
+    def call_function(self, action, params=""):
+        func_name = self.actions_file[action]["function"]
+        if func_name not in functions_registry:
+            return None
+        missing = functions_registry.missing(func_name)
+        if missing:
+            return f"{self.lang['missing module']} : {', '.join(missing)}"
+        call = functions_registry.get(func_name)
+        if action == "terminate":
+            return call(cancel_callback=lambda: setattr(self, "cancel", True))
+        elif params:
+            return call(params)
+        return call()
+
+    def group_actions(self, actions):
+        """
+        Retourne [(actions brutes, action, params), ...]. Les actions "batch" qui se suivent
+        (ex : plusieurs press) sont fusionnées en un seul appel.
+        """
+        groups = []
+        for full_action in actions:
+            params = " ".join(full_action.strip().split()[1:])
+            action = full_action.replace(params, "").strip()
+            batch = self.actions_file.get(action, {}).get("batch", False)
+            if batch and groups and groups[-1][1] == action and params:
+                full_actions, _, previous = groups[-1]
+                groups[-1] = (full_actions + [full_action], action, f"{previous} {params}")
+            else:
+                groups.append(([full_action], action, params))
+        return groups
+
+    def run_actions(self, say, actions, refused):
+        """
+        Exécute les actions typées d'une réponse JSON et retourne le texte final.
+        """
+        actions = self.structured.batch(actions)
+        results = self.executor.execute([(action.name, action.params) for action in actions])
+        parts = [say] if say else []
+        for func_result in results:
+            parts.append(self.lang["non authorized action"] if func_result is None else str(func_result))
+        if refused:
+            parts.append(self.lang["non authorized action"])
+        return " ".join(parts)
+
     def agent_loop(self, user_input: str):
-        ai_response = self.query_ollama(user_input)
-        if "ACTION:" in ai_response:
+        turn = Turn(self)
+        self.turn = {"start": time.perf_counter(), "source": "llm", "actions": [], "timings": {}}
+        if self.use_router:
+            start = time.perf_counter()
+            intent = self.router.route(user_input)
+            self.timing("route", start)
+            if intent:
+                action, params = intent
+                start = time.perf_counter()
+                func_result = self.execute(action, params)
+                self.timing("actions", start)
+                if func_result is not None:
+                    self.turn.update(source="router", actions=[action])
+                    self.router.hit()
+                    result = self.format_markdown(str(func_result))
+                    self.update_history(user_input, result)
+                    self.log(result, turn=turn, templated=True)
+                    return
+
+        on_sentence = None
+        if self.use_speaker and self.use_stream and self.reply_format != "json":
+            on_sentence = turn.say
+        # Same command as before: reuse the model's ACTION answer
+        ai_response = self.responses.get(user_input) if self.use_response_cache else None
+        if ai_response is not None:
+            self.spoken = ""
+            self.turn["source"] = "cache"
+        else:
+            start = time.perf_counter()
+            ai_response = self.query_ollama(user_input, on_sentence=on_sentence, turn=turn)
+            if ai_response is None:
+                return
+            self.timing("llm", start)
+            self.router.miss(time.perf_counter() - start)
+            if self.use_response_cache:
+                self.responses.put(user_input, ai_response)
+        if turn.cancelled():
+            return
+        # Only ACTION, no free text: what is said is built by the action functions
+        templated = ResponseCache.cacheable(ai_response)
+        start = time.perf_counter()
+        reply = self.structured.parse(ai_response) if self.reply_format == "json" else None
+        if reply is not None:
+            self.turn["actions"] = [action.name for action in reply[1]]
+            ai_response = self.run_actions(*reply)
+            self.timing("actions", start)
+        elif "ACTION:" in ai_response:
             ai_action = "ACTION:" + ai_response.split("ACTION:", 1)[-1]
             actions = re.findall(r"ACTION:\s*(.*?)(?=\s*ACTION:|$)", ai_action)
             actions = [a.strip() for a in actions]
-            for full_action in actions:
-                params = " ".join(full_action.strip().split()[1:])
-                action = full_action.replace(params, "").strip()
-                if action in self.ALLOWED_ACTIONS:
-                    import functions
-                    func_name = self.actions_file[action]["function"]
-                    call = functions.functions_registry.get(func_name)
-                    if call:
-                        if action == "terminate":
-                            func_result = call(cancel_callback=lambda: setattr(self, "cancel", True))
-                        elif params:
-                            func_result = call(params)
-                        else:
-                            func_result = call()
-                        ai_response = ai_response.replace(f'ACTION: {full_action}', func_result)
-                    else:
-                        ai_response = self.lang["non authorized action"]
+            groups = [g for g in self.group_actions(actions) if g[1] in self.ALLOWED_ACTIONS]
+            self.turn["actions"] = [action for _, action, _ in groups]
+            results = self.executor.execute([(action, params) for _, action, params in groups])
+            self.timing("actions", start)
+            for (full_actions, _, _), func_result in zip(groups, results):
+                if func_result is not None:
+                    ai_response = ai_response.replace(f'ACTION: {full_actions[0]}', str(func_result))
+                    for full_action in full_actions[1:]:
+                        ai_response = ai_response.replace(f'ACTION: {full_action}', "")
+                else:
+                    ai_response = self.lang["non authorized action"]
 
         result = self.format_markdown(ai_response)
         self.update_history(user_input, result)
-        self.log(result)
+        
+        # Only speak what the stream hasn't already said
+        remaining = result
+        if on_sentence and ai_response.startswith(self.spoken):
+            remaining = self.format_markdown(ai_response[len(self.spoken):])
+        self.log(result, remaining, turn=turn, templated=templated)
 
-    def log(self, result):
+    def log(self, result, to_say=None, turn=None, templated=False):
+        if turn and turn.cancelled():
+            return
+        if to_say is None:
+            to_say = result
         if self.use_logging:
             self.log_signal.emit(f"🤖 {result}")
         if self.use_speaker:
-            self.speaker.say(result)
+            if turn:
+                turn.say(to_say, templated)
+            else:
+                self.speaker.say(to_say, templated=templated)
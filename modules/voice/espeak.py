@@ -0,0 +1,125 @@
+import ctypes
+import ctypes.util
+import io
+import platform
+import subprocess
+import wave
+
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+POS_CHARACTER = 1
+espeakCHARS_UTF8 = 1
+espeakRATE = 1
+espeakVOLUME = 2
+espeakPITCH = 3
+espeakWORDGAP = 7
+
+system = platform.system()
+windows_dir = "C://Program Files/eSpeak NG"
+
+SynthCallback = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+
+
+class Espeak():
+    """
+    Binding direct de libespeak-ng : le moteur reste chargé dans le processus
+    et rend du PCM int16 mono, sans lancer de programme à chaque phrase.
+    """
+
+    def __init__(self):
+        if system == "Windows":
+            self.lib = ctypes.cdll.LoadLibrary(f"{windows_dir}/libespeak-ng.dll")
+            path = windows_dir.encode()
+        else:
+            name = ctypes.util.find_library("espeak-ng") or "libespeak-ng.so.1"
+            self.lib = ctypes.cdll.LoadLibrary(name)
+            path = None
+        self.lib.espeak_Initialize.restype = ctypes.c_int
+        self.lib.espeak_Synth.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p
+        ]
+        self.samplerate = self.lib.espeak_Initialize(AUDIO_OUTPUT_SYNCHRONOUS, 0, path, 0)
+        if self.samplerate <= 0:
+            raise OSError("espeak-ng initialization failed")
+        self.chunks = []
+        self.cancelled = False
+        self.callback = SynthCallback(self.on_samples)  # keep a reference
+        self.lib.espeak_SetSynthCallback(self.callback)
+        self.settings = None
+
+    def on_samples(self, wav, count, events):
+        if wav and count > 0:
+            self.chunks.append(ctypes.string_at(wav, count * 2))
+        return 1 if self.cancelled else 0
+
+    def configure(self, voice, speed, pitch, volume, gap):
+        settings = (voice, speed, pitch, volume, gap)
+        if settings == self.settings:
+            return
+        self.lib.espeak_SetVoiceByName(voice.encode())
+        self.lib.espeak_SetParameter(espeakRATE, int(speed), 0)
+        self.lib.espeak_SetParameter(espeakPITCH, int(pitch), 0)
+        self.lib.espeak_SetParameter(espeakVOLUME, int(volume), 0)
+        self.lib.espeak_SetParameter(espeakWORDGAP, int(gap), 0)
+        self.settings = settings
+
+    def synth(self, text, voice, speed, pitch, volume, gap):
+        """
+        Retourne (pcm, samplerate), pcm vaut None si la synthèse a été annulée.
+        """
+        self.configure(voice, speed, pitch, volume, gap)
+        self.chunks = []
+        self.cancelled = False
+        data = text.encode("utf-8") + b"\0"
+        self.lib.espeak_Synth(data, len(data), 0, POS_CHARACTER, 0, espeakCHARS_UTF8, None, None)
+        self.lib.espeak_Synchronize()
+        if self.cancelled:
+            return None, self.samplerate
+        return b"".join(self.chunks), self.samplerate
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EspeakProcess():
+    """
+    Repli quand la bibliothèque n'est pas trouvée : espeak-ng --stdout.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.samplerate = 22050
+
+    def synth(self, text, voice, speed, pitch, volume, gap):
+        if system == "Linux":
+            binary = "espeak-ng"
+        else:
+            binary = f"{windows_dir}/espeak-ng.exe"
+        cmd = [
+            binary,
+            "-v", voice,
+            "-s", str(speed),
+            "-p", str(pitch),
+            "-a", str(volume),
+            "-g", str(gap),
+            "--stdout",
+            text
+        ]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        output, _ = self.process.communicate()
+        if self.process.returncode != 0 or not output:
+            return None, self.samplerate
+        with wave.open(io.BytesIO(output)) as wav:
+            self.samplerate = wav.getframerate()
+            return wav.readframes(wav.getnframes()), self.samplerate
+
+    def cancel(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+
+
+def load_engine():
+    try:
+        return Espeak()
+    except OSError:
+        return EspeakProcess()
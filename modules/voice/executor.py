@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class ActionExecutor():
+    """
+    Exécute les actions d'une même réponse en parallèle.
+    Une action attend les actions précédentes listées dans son champ
+    "depends" de actions.json ("*" pour toutes), les résultats sont
+    rendus dans l'ordre de la réponse.
+    """
+
+    def __init__(self, run, actions_file, workers=4):
+        self.run = run  # callable(action, params) -> result
+        self.actions_file = actions_file
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="action")
+
+    def depends_on(self, action, previous):
+        depends = self.actions_file.get(action, {}).get("depends", [])
+        return "*" in depends or previous in depends
+
+    def call(self, waits, action, params):
+        # Earlier futures were submitted first, so waiting here can't deadlock the pool
+        wait(waits)
+        try:
+            return self.run(action, params)
+        except Exception as e:
+            return str(e)
+
+    def execute(self, actions):
+        """
+        actions : [(action, params), ...]. Retourne les résultats dans le même ordre.
+        """
+        if len(actions) == 1:
+            return [self.call([], *actions[0])]
+        futures = []
+        for action, params in actions:
+            waits = [
+                future for (previous, _), future in zip(actions, futures)
+                if self.depends_on(action, previous)
+            ]
+            futures.append(self.pool.submit(self.call, waits, action, params))
+        return [future.result() for future in futures]
@@ -0,0 +1,131 @@
+import os
+import re
+import numpy as np
+
+
+def model_samplerate(model_path, fallback=16000):
+    """
+    Lit la fréquence d'échantillonnage du modèle Vosk (conf/mfcc.conf).
+    """
+    conf = os.path.join(model_path, "conf", "mfcc.conf")
+    try:
+        with open(conf, 'r', encoding='utf-8') as f:
+            match = re.search(r"--sample-frequency=(\d+)", f.read())
+            if match:
+                return int(match.group(1))
+    except OSError:
+        pass
+    return fallback
+
+
+def device_samplerate(fallback=48000):
+    """
+    Fréquence native du micro par défaut.
+    """
+    try:
+        import sounddevice as sd
+        return int(sd.query_devices(kind="input")["default_samplerate"])
+    except Exception:
+        return fallback
+
+
+class Resampler():
+    def __init__(self, rate_in, rate_out):
+        self.rate_in = rate_in
+        self.rate_out = rate_out
+
+    def __call__(self, samples):
+        if self.rate_in == self.rate_out or not len(samples):
+            return samples
+        ratio = self.rate_in / self.rate_out
+        if ratio > 1:
+            # Box low-pass before decimation to limit aliasing
+            width = int(round(ratio))
+            if width > 1:
+                samples = np.convolve(samples, np.ones(width) / width, mode="same")
+        count = int(len(samples) * self.rate_out / self.rate_in)
+        positions = np.arange(count) * ratio
+        return np.interp(positions, np.arange(len(samples)), samples)
+
+
+class Gain():
+    """
+    Ramène le volume vers une cible RMS, avec un gain lissé et plafonné.
+    """
+
+    def __init__(self, target=3000.0, max_gain=10.0, smoothing=0.9, floor=300.0):
+        self.target = target
+        self.floor = floor  # quieter blocks don't move the gain
+        self.max_gain = max_gain
+        self.smoothing = smoothing
+        self.gain = 1.0
+
+    def __call__(self, samples):
+        rms = np.sqrt(np.mean(samples ** 2)) if len(samples) else 0.0
+        if rms > self.floor:
+            wanted = min(self.target / rms, self.max_gain)
+            self.gain = self.smoothing * self.gain + (1 - self.smoothing) * wanted
+        return samples * self.gain
+
+
+class VAD():
+    """
+    Détection de parole par énergie et taux de passage par zéro.
+    Quelques blocs de silence passent encore après la parole,
+    sinon Vosk ne termine jamais la phrase.
+    """
+
+    def __init__(self, rate, energy_db=-45.0, zcr_max=0.35, hangover=1.0, frame=0.03):
+        self.frame = max(1, int(rate * frame))
+        self.energy_db = energy_db
+        self.zcr_max = zcr_max
+        self.hangover = hangover
+        self.rate = rate
+        self.silence = hangover  # seconds of silence since last speech
+
+    def is_speech(self, samples):
+        count = len(samples) // self.frame
+        if not count:
+            return False
+        frames = samples[:count * self.frame].reshape(count, self.frame)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1)) / 32768.0
+        db = 20 * np.log10(rms + 1e-10)
+        zcr = np.mean(np.abs(np.diff(np.sign(frames), axis=1)) > 0, axis=1)
+        return bool(np.any((db > self.energy_db) & (zcr < self.zcr_max)))
+
+    def __call__(self, samples):
+        if self.is_speech(samples):
+            self.silence = 0.0
+            return samples
+        passed = self.silence < self.hangover
+        self.silence += len(samples) / self.rate
+        return samples if passed else None
+
+
+class Frontend():
+    """
+    Chaîne de traitement entre le micro et Vosk.
+    Chaque étape prend et retourne un tableau float (ou None pour ignorer le bloc).
+    """
+
+    def __init__(self, rate_in, rate_out, stages=None):
+        self.rate_in = rate_in
+        self.rate_out = rate_out
+        if stages is None:
+            stages = [Resampler(rate_in, rate_out), VAD(rate_out), Gain()]
+        self.stages = stages
+        self.blocks_in = 0
+        self.blocks_out = 0
+
+    def process(self, data):
+        """
+        Prend un bloc int16 brut, retourne un bloc int16 pour Vosk ou None.
+        """
+        self.blocks_in += 1
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        for stage in self.stages:
+            samples = stage(samples)
+            if samples is None:
+                return None
+        self.blocks_out += 1
+        return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
@@ -1,22 +1,75 @@
 import os
+import json
 import importlib
-import inspect
+import importlib.util
+import threading
 
-__all__ = []
+__all__ = ["functions_registry"]
 
 # Current folder
 folder = os.path.dirname(__file__)
+manifest_path = os.path.join(folder, "manifest.json")
 
-# stocks every function dynamicly
-functions_registry = {}
-
-for filename in os.listdir(folder):
-    if filename.endswith(".py") and filename != "__init__.py":
-        module_name = filename[:-3]
-        module = importlib.import_module(f".{module_name}", package=__name__)
-        
-        for name, obj in inspect.getmembers(module):
-            if inspect.isfunction(obj):
-                functions_registry[name] = obj
-                globals()[name] = obj
-                __all__.append(name)
+
+class FunctionRegistry():
+    """
+    Fonctions d'action décrites par manifest.json (fonction -> module, imports requis, actions,
+    et "warm" : fonction du module appelée au pré-chargement).
+    Un module n'est importé qu'au premier appel d'une de ses fonctions,
+    ou en avance par prewarm pour les actions les plus utilisées.
+    """
+
+    def __init__(self, manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.loaded = {}  # function name -> callable
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.manifest
+
+    def missing(self, name):
+        """
+        Imports requis par cette fonction qui ne sont pas installés (sans les importer).
+        """
+        requires = self.manifest.get(name, {}).get("requires", [])
+        return [r for r in requires if importlib.util.find_spec(r) is None]
+
+    def get(self, name, default=None):
+        call = self.loaded.get(name)
+        if call:
+            return call
+        entry = self.manifest.get(name)
+        if entry is None:
+            return default
+        # Concurrent actions may ask for the same module at once
+        with self.lock:
+            if name not in self.loaded:
+                module = importlib.import_module(f".{entry['module']}", package=__name__)
+                self.loaded[name] = getattr(module, name)
+        return self.loaded[name]
+
+    def for_actions(self, actions):
+        return [name for name, entry in self.manifest.items() if set(entry.get("actions", [])) & set(actions)]
+
+    def prewarm(self, names):
+        """
+        Importe en arrière-plan les modules de ces fonctions.
+        """
+        def load():
+            for name in names:
+                if self.missing(name):
+                    continue
+                try:
+                    self.get(name)
+                    warm = self.manifest[name].get("warm")
+                    if warm:
+                        # Module level setup, e.g. reading every press template
+                        module = importlib.import_module(f".{self.manifest[name]['module']}", package=__name__)
+                        getattr(module, warm)()
+                except Exception as e:
+                    print(f"{name}: {e}")
+        threading.Thread(target=load, daemon=True).start()
+
+
+functions_registry = FunctionRegistry(manifest_path)
@@ -1,16 +1,15 @@
 import configparser
 import subprocess
-import cv2
-import numpy as np
-import pyautogui
 import time
 import json
 from datetime import datetime
-import difflib
 import os
 import platform
 import sys
 import __main__
+from .desktop.app_index import AppIndex
+from .desktop.processes import processes
+from .desktop.windows import windows
 
 def resource_path(relative_path: str) -> str:
     try:
@@ -34,8 +33,7 @@ lang_file = os.path.join(lang_dir, f"{config.get('General', 'lang', fallback='en
 with open(lang_file, 'r', encoding='utf-8') as f:
     lang = json.load(f)
 
-with open(apps_path, 'r', encoding='utf-8') as f:
-    ALLOWED_APPS = json.load(f)
+app_index = AppIndex(apps_path)
 
 def run_application(app_name, *args):
     app_name = app_name.lower()
@@ -45,31 +43,11 @@ def run_application(app_name, *args):
     else:
         executable = "exec_windows"
 
-    # Exact or partial search
+    # Exact, partial or fuzzy search
     cmd = None
-    for data in ALLOWED_APPS.values():
-        # exact search
-        if app_name in data["aliases"]:
-            cmd = data[executable]
-            break
-        # partial search
-        for alias in data["aliases"]:
-            if app_name in alias or alias in app_name:
-                cmd = data[executable]
-                break
-        if cmd:
-            break
-
-    # With no correspondence, fuzzy matching
-    if not cmd:
-        all_aliases = [alias for data in ALLOWED_APPS.values() for alias in data["aliases"]]
-        matches = difflib.get_close_matches(app_name, [a for a in all_aliases], n=1, cutoff=0.7)
-        if matches:
-            match_alias = matches[0]
-            for data in ALLOWED_APPS.values():
-                if match_alias in data["aliases"]:
-                    cmd = data[executable]
-                    break
+    key, data = app_index.find(app_name)
+    if data:
+        cmd = data[executable]
     
     if cmd:
         try:
@@ -78,29 +56,11 @@ def run_application(app_name, *args):
 
             # Add args if any
             if args:
-                exec_cmd.extend([args])
+                exec_cmd.extend(args)
             
-            # Linux
-            if system == "Linux":
-                subprocess.Popen(
-                    exec_cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    stdin=subprocess.DEVNULL,
-                    start_new_session=True
-                )
-            # Windows
-            elif system == "Windows":
-                subprocess.Popen(
-                    exec_cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    stdin=subprocess.DEVNULL,
-                    creationflags=subprocess.CREATE_NEW_CONSOLE
-                )
-
-            else:
+            if system not in ("Linux", "Windows"):
                 return f"{lang['launch error']} {app_name} : OS ERROR."
+            processes.launch(key, exec_cmd)
             return f"{lang['app']} {app_name} {lang['lauched']}."
         except Exception as e:
             return f"{lang['launch error']} {app_name} : {e}."
@@ -115,32 +75,18 @@ def close_application(app_name):
     else:
         executable = "exec_windows"
 
-    # Exact or partial search
+    # Exact, partial or fuzzy search
     cmd = None
-    for data in ALLOWED_APPS.values():
-        if app_name in data["aliases"]:
-            cmd = data[executable]
-            break
-        for alias in data["aliases"]:
-            if app_name in alias or alias in app_name:
-                cmd = data[executable]
-                break
-        if cmd:
-            break
-
-    # Fuzzy matching
-    if not cmd:
-        all_aliases = [alias for data in ALLOWED_APPS.values() for alias in data["aliases"]]
-        matches = difflib.get_close_matches(app_name, [a for a in all_aliases], n=1, cutoff=0.7)
-        if matches:
-            match_alias = matches[0]
-            for data in ALLOWED_APPS.values():
-                if match_alias in data["aliases"]:
-                    cmd = data[executable]
-                    break
+    key, data = app_index.find(app_name)
+    if data:
+        cmd = data[executable]
 
     if cmd:
         try:
+            # Launched by Athena: signal the known processes directly
+            if processes.close(key):
+                return f"{lang['app']} {app_name} {lang['closed']}."
+
             # --- Linux ---
             if system == "Linux":
                 command = f"pkill -TERM {cmd}"
@@ -177,6 +123,28 @@ def close_application(app_name):
         return f"{lang['app']} {app_name} {lang['not authorized']}."
 
 
+def restart_application(app_name):
+    app_name = app_name.lower()
+
+    if system == "Linux":
+        executable = "exec_linux"
+    else:
+        executable = "exec_windows"
+
+    key, data = app_index.find(app_name)
+    if not data or not data[executable]:
+        return f"{lang['app']} {app_name} {lang['not authorized']}."
+
+    # Not launched by Athena: close it the usual way, then start it again
+    if not processes.running(key):
+        close_application(app_name)
+    try:
+        processes.restart(key, [data[executable]])
+        return f"{lang['app']} {app_name} {lang['restarted']}."
+    except Exception as e:
+        return f"{lang['launch error']} {app_name} : {e}."
+
+
 def get_time():
     now = datetime.now()
     current_time = now.strftime("%H:%M")
@@ -191,86 +159,23 @@ def terminate(cancel_callback):
     cancel_callback()
     return f"{lang['goodbye']} {name}"
 
-def press(place):
-    system = platform.system()
-
-    try:
-        # -----------------------------
-        # Capture d'écran (en mémoire)
-        # -----------------------------
-        if system == "Linux":
-            result = subprocess.run(
-                ["flameshot", "full", "--raw"],
-                stdout=subprocess.PIPE,
-                check=True
-            )
-            image_data = result.stdout  # Données PNG brutes
-        elif system == "Windows":
-            screen_img = pyautogui.screenshot()
-            img_byte_arr = io.BytesIO()
-            screen_img.save(img_byte_arr, format="PNG")
-            image_data = img_byte_arr.getvalue()
-        else:
-            return f"{lang['screenshot not supported']} ({system})"
-
-        # Décodage direct en image OpenCV
-        np_arr = np.frombuffer(image_data, np.uint8)
-        screen = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        if screen is None:
-            return lang["screenshot unreadable"]
-
-        # -----------------------------
-        # Lecture du template
-        # -----------------------------
-        template_path = f"./modules/voice/images/{place.lower()}.png"
-        template = cv2.imread(template_path)
-        if template is None:
-            return lang["patern unreadable"]
-
-        # -----------------------------
-        # Multi-scale Template Matching
-        # -----------------------------
-        threshold = 0.9
-        found = None
-
-        for scale in np.linspace(0.01, 1.0, 50):  # 1% à 100%
-            resized = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
-            h, w = resized.shape[:2]
-
-            if h > screen.shape[0] or w > screen.shape[1]:
-                continue
-
-            result = cv2.matchTemplate(screen, resized, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(result)
-
-            if max_val > threshold:
-                found = (max_val, max_loc, (w, h))
-                break
-
-        # -----------------------------
-        # Clic si trouvé
-        # -----------------------------
-        if found:
-            _, top_left, (w, h) = found
-            center_x = top_left[0] + w // 2
-            center_y = top_left[1] + h // 2
-            pyautogui.click(center_x, center_y)
-            result_msg = f"{place} {lang['clicked']}."
-        else:
-            result_msg = f"{place} {lang['not found']}."
-
-        return result_msg
-
-    except Exception as e:
-        return lang.get("screenshot error", str(e))
-
-
 def set_focus(title):
 
     if system == "Linux":
 
-        result = os.system(f'wmctrl -a "{title}"')
-        if result != 0:
+        if windows.start():
+            # Title, app aliases and executable all help find the window
+            key, data = app_index.find(title)
+            aliases = [key] + list(data["aliases"]) + [data["exec_linux"]] if data else []
+            window = windows.find(title, aliases)
+            if window is None:
+                return f"{lang['cant find window']} '{title}'."
+            windows.focus(window)
+            return f"{lang['focused']} {window.title or title}"
+
+        # No X server reachable (Wayland...), wmctrl is the last resort
+        result = subprocess.run(["wmctrl", "-a", title], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
             return f"{lang['cant find window']} '{title}'. {lang['no wayland']}."
         else:
             return f"{lang['focused']} {title}"
@@ -312,14 +217,13 @@ def browse(subject):
     cmd = None
     search_url = None
     browser = None
-    for data in ALLOWED_APPS.values():
-        if "browser" in data.keys():
-            search_url = data["browser"]
-            if system == "Linux":
-                browser = data["exec_linux"]
-            else:
-                browser = data["exec_windows"]
-            break
+    browser_key, data = app_index.find_browser()
+    if data:
+        search_url = data["browser"]
+        if system == "Linux":
+            browser = data["exec_linux"]
+        else:
+            browser = data["exec_windows"]
         
     if search_url and browser:
         research = subject.replace(" ", "+")
@@ -329,25 +233,7 @@ def browse(subject):
 
     try:
         exec_cmd = cmd.split(" ")
-        
-        # Linux
-        if system == "Linux":
-            subprocess.Popen(
-                exec_cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                stdin=subprocess.DEVNULL,
-                start_new_session=True
-            )
-        # Windows
-        else:
-            subprocess.Popen(
-                exec_cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                stdin=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NEW_CONSOLE
-            )
+        processes.launch(browser_key, exec_cmd)
         return f"{lang['searching for']} {subject}"
     except Exception as e:
         return e
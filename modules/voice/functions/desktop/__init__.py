@@ -0,0 +1 @@
+# Desktop helpers used by the action functions (not registered as actions)
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+
+
+def levenshtein(a, b, limit=None):
+    """
+    Distance d'édition. Avec limit, s'arrête dès qu'elle dépasse limit (retourne alors plus que limit).
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class BKTree():
+    """
+    Arbre BK : recherche des mots à distance d'édition bornée sans tout parcourir.
+    """
+
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """
+        Retourne [(distance, mot), ...] triés par distance.
+        """
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_word, children = stack.pop()
+            # Past the farthest child, the exact distance doesn't matter
+            limit = max(children, default=0) + max_distance
+            distance = levenshtein(word, node_word, limit)
+            if distance <= max_distance:
+                found.append((distance, node_word))
+            for d in range(distance - max_distance, distance + max_distance + 1):
+                if d in children:
+                    stack.append(children[d])
+        return sorted(found)
+
+
+def ngrams(text, n=3):
+    text = f" {text} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class AppIndex():
+    """
+    Index des applications de apps.json, construit dès la création
+    et reconstruit quand le fichier change :
+    - table exacte alias -> application,
+    - index de trigrammes pour les correspondances partielles,
+    - arbre BK pour les correspondances approximatives (1 ou 2 fautes au plus).
+    """
+
+    def __init__(self, path, max_distance=2):
+        self.path = path
+        self.max_distance = max_distance  # edits allowed for fuzzy matches, 1 for short names
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.build({})
+        self.refresh()
+
+    def refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self.mtime:
+            return
+        with self.lock:
+            if mtime == self.mtime:
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                apps = json.load(f)
+            self.build(apps)
+            self.mtime = mtime
+
+    def build(self, apps):
+        exact = {}   # alias -> key (first app wins, like apps.json order)
+        order = {}   # alias -> position, to keep the apps.json priority
+        grams = {}   # trigram -> set of aliases
+        browser = None
+        for key, data in apps.items():
+            if browser is None and "browser" in data:
+                browser = key
+            for alias in data["aliases"]:
+                alias = alias.lower()
+                if alias in exact:
+                    continue
+                exact[alias] = key
+                order[alias] = len(order)
+                for gram in ngrams(alias):
+                    grams.setdefault(gram, set()).add(alias)
+        tree = BKTree(exact)
+        cache = {}  # name -> alias, for names already resolved
+        # Everything is built first, then swapped in one assignment: a lookup
+        # reads the snapshot once and never pairs new aliases with an old tree
+        self.snapshot = (apps, exact, order, grams, browser, tree, cache)
+
+    @staticmethod
+    def partial(name, exact, order, grams):
+        candidates = set()
+        # name inside an alias: every trigram of name must be in the alias
+        inner = {g for g in ngrams(name) if not g.startswith(" ") and not g.endswith(" ")}
+        if inner:
+            sets = [grams.get(g, set()) for g in inner]
+            if all(sets):
+                candidates.update(alias for alias in set.intersection(*sets) if name in alias)
+        else:
+            # too short for trigrams
+            candidates.update(alias for alias in exact if name in alias)
+        # alias inside name: look up every substring of name
+        for start in range(len(name)):
+            for end in range(start + 1, len(name) + 1):
+                if name[start:end] in exact:
+                    candidates.add(name[start:end])
+        if not candidates:
+            return None
+        return min(candidates, key=lambda alias: order[alias])
+
+    def fuzzy(self, name, order, tree):
+        # One typo in a short name is already a different word
+        max_distance = 1 if len(name) <= 4 else self.max_distance
+        found = tree.search(name, max_distance)
+        if not found:
+            return None
+        return min(found, key=lambda f: (f[0], order[f[1]]))[1]
+
+    def find(self, name):
+        """
+        Retourne (clé, données) de l'application pour ce nom, ou (None, None).
+        """
+        self.refresh()
+        apps, exact, order, grams, _, tree, cache = self.snapshot
+        name = name.lower().strip()
+        if not name:
+            return None, None
+        if name in cache:
+            alias = cache[name]
+        else:
+            alias = name if name in exact else self.partial(name, exact, order, grams) or self.fuzzy(name, order, tree)
+            if len(cache) > 1024:
+                cache.clear()
+            cache[name] = alias
+        if alias is None:
+            return None, None
+        key = exact[alias]
+        return key, apps[key]
+
+    def find_browser(self):
+        """
+        Retourne (clé, données) de la première application avec un moteur de recherche.
+        """
+        self.refresh()
+        apps, _, _, _, browser, _, _ = self.snapshot
+        if browser is None:
+            return None, None
+        return browser, apps[browser]
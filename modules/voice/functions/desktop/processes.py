@@ -0,0 +1,101 @@
+import os
+import platform
+import signal
+import subprocess
+import threading
+
+system = platform.system()
+
+
+class ProcessManager():
+    """
+    Garde la trace des processus lancés par Athéna, par application :
+    fermeture en signalant directement les PID connus, sans parcourir
+    la table des processus, et redémarrage natif.
+    """
+
+    def __init__(self):
+        self.processes = {}  # key -> [(Popen, cmd), ...]
+        self.lock = threading.Lock()
+
+    def launch(self, key, cmd):
+        if system == "Linux":
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                start_new_session=True  # own process group, pgid == pid
+            )
+        elif system == "Windows":
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                creationflags=subprocess.CREATE_NEW_CONSOLE
+            )
+        else:
+            raise OSError(system)
+        with self.lock:
+            self.processes.setdefault(key, []).append((process, cmd))
+        threading.Thread(target=self.reap, args=(key, process), daemon=True).start()
+        return process
+
+    def reap(self, key, process):
+        # Wait for the child so it never stays a zombie, then forget it
+        process.wait()
+        with self.lock:
+            entries = [e for e in self.processes.get(key, []) if e[0] is not process]
+            if entries:
+                self.processes[key] = entries
+            else:
+                self.processes.pop(key, None)
+
+    def running(self, key):
+        with self.lock:
+            return [e for e in self.processes.get(key, []) if e[0].poll() is None]
+
+    def signal(self, process, sig):
+        if system == "Linux":
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+
+    def close(self, key, timeout=3):
+        """
+        Ferme les processus connus de cette application.
+        Retourne la liste des commandes fermées (vide si aucun processus connu).
+        """
+        entries = self.running(key)
+        for process, _ in entries:
+            try:
+                self.signal(process, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+        for process, _ in entries:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                try:
+                    self.signal(process, signal.SIGKILL if system == "Linux" else signal.SIGTERM)
+                except (ProcessLookupError, PermissionError):
+                    pass
+        return [cmd for _, cmd in entries]
+
+    def restart(self, key, cmd=None):
+        """
+        Ferme puis relance l'application avec la même commande
+        (ou cmd si elle n'avait pas été lancée par Athéna).
+        """
+        closed = self.close(key)
+        if closed:
+            cmd = closed[0]
+        if cmd is None:
+            return None
+        return self.launch(key, cmd)
+
+
+processes = ProcessManager()
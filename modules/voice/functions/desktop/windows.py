@@ -0,0 +1,170 @@
+import difflib
+import threading
+
+try:
+    from Xlib import X, Xatom, display as xdisplay, error as xerror
+    from Xlib.protocol import event as xevent
+except ImportError:
+    xdisplay = None
+
+
+class Window():
+    def __init__(self, id, title="", wm_class="", pid=None):
+        self.id = id
+        self.title = title
+        self.wm_class = wm_class
+        self.pid = pid
+
+
+class WindowTracker():
+    """
+    Liste des fenêtres (id, titre, classe, pid) tenue à jour par les
+    événements EWMH du serveur X, et mise au premier plan sans lancer wmctrl.
+    """
+
+    def __init__(self, display=None):
+        self.display_name = display  # e.g. ":99" for an Xvfb server
+        self.windows = {}  # id -> Window
+        # Reentrant: start() refreshes the list while holding it
+        self.lock = threading.RLock()
+        self.started = False
+        self.available = xdisplay is not None
+
+    def start(self):
+        """
+        Ouvre les connexions X et lance l'écoute des événements.
+        Retourne False s'il n'y a pas de serveur X utilisable (Wayland...).
+        """
+        with self.lock:
+            return self.connect()
+
+    def connect(self):
+        # Focus actions run in parallel, only one of them may open the connections
+        if self.started:
+            return True
+        if not self.available:
+            return False
+        try:
+            # One connection per thread, Xlib displays aren't thread safe
+            self.dpy = xdisplay.Display(self.display_name)
+            self.events = xdisplay.Display(self.display_name)
+        except Exception:
+            self.available = False
+            return False
+        self.atoms = {
+            name: self.dpy.intern_atom(name)
+            for name in ("_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW", "_NET_WM_NAME", "_NET_WM_PID", "UTF8_STRING", "WM_NAME")
+        }
+        self.events.screen().root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.refresh()
+        self.started = True
+        threading.Thread(target=self.run, daemon=True).start()
+        return True
+
+    def client_list(self):
+        root = self.events.screen().root
+        prop = root.get_full_property(self.atoms["_NET_CLIENT_LIST"], Xatom.WINDOW)
+        return list(prop.value) if prop else []
+
+    def read(self, wid):
+        window = self.events.create_resource_object("window", wid)
+        try:
+            title = window.get_full_property(self.atoms["_NET_WM_NAME"], self.atoms["UTF8_STRING"])
+            title = title.value if title else window.get_wm_name()
+            if isinstance(title, bytes):
+                title = title.decode("utf-8", "replace")
+            wm_class = window.get_wm_class()
+            pid = window.get_full_property(self.atoms["_NET_WM_PID"], Xatom.CARDINAL)
+            window.change_attributes(event_mask=X.PropertyChangeMask)
+        except xerror.XError:
+            return None
+        return Window(wid, title or "", " ".join(wm_class or ()), pid.value[0] if pid else None)
+
+    def refresh(self):
+        ids = self.client_list()
+        with self.lock:
+            known = dict(self.windows)
+        windows = {}
+        for wid in ids:
+            window = known.get(wid) or self.read(wid)
+            if window:
+                windows[wid] = window
+        with self.lock:
+            self.windows = windows
+
+    def run(self):
+        while True:
+            try:
+                event = self.events.next_event()
+                if event.type != X.PropertyNotify:
+                    continue
+                if event.atom == self.atoms["_NET_CLIENT_LIST"]:
+                    self.refresh()
+                elif event.atom in (self.atoms["_NET_WM_NAME"], self.atoms["WM_NAME"]):
+                    window = self.read(event.window.id)
+                    if window:
+                        with self.lock:
+                            if window.id in self.windows:
+                                self.windows[window.id] = window
+            except (xerror.ConnectionClosedError, OSError) as e:
+                # X server gone or restarted: the next start() reconnects,
+                # or reports it unavailable and wmctrl is used instead
+                print(e)
+                self.disconnect()
+                return
+            except Exception as e:
+                print(e)
+
+    def disconnect(self):
+        with self.lock:
+            self.started = False
+            self.windows = {}
+            for connection in (self.dpy, self.events):
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+    def list(self):
+        with self.lock:
+            return list(self.windows.values())
+
+    def find(self, query, aliases=()):
+        """
+        Meilleure fenêtre pour ce nom : titre qui le contient, classe qui
+        correspond à un alias de l'application, puis ressemblance approximative.
+        """
+        query = query.lower().strip()
+        terms = {query} | {a.lower() for a in aliases if a}
+        best, best_score = None, 0.0
+        for window in self.list():
+            title, wm_class = window.title.lower(), window.wm_class.lower()
+            if any(t in title for t in terms):
+                score = 1.0
+            elif any(t in wm_class or (wm_class and wm_class.split()[-1] in t) for t in terms):
+                score = 0.9
+            else:
+                score = max(difflib.SequenceMatcher(None, query, w).ratio() for w in title.split() or [""])
+            if score > best_score:
+                best, best_score = window, score
+        return best if best_score >= 0.7 else None
+
+    def focus(self, window):
+        """
+        Demande au gestionnaire de fenêtres d'activer la fenêtre (_NET_ACTIVE_WINDOW).
+        """
+        # self.dpy is shared by the action threads
+        with self.lock:
+            root = self.dpy.screen().root
+            target = self.dpy.create_resource_object("window", window.id)
+            message = xevent.ClientMessage(
+                window=target,
+                client_type=self.atoms["_NET_ACTIVE_WINDOW"],
+                data=(32, [2, X.CurrentTime, 0, 0, 0])  # 2: request from a pager/user tool
+            )
+            root.send_event(message, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+            target.map()
+            self.dpy.flush()
+
+
+windows = WindowTracker()
@@ -0,0 +1,86 @@
+import configparser
+import json
+import re
+import os
+import platform
+import sys
+import __main__
+import pyautogui
+from .vision.matcher import Matcher
+from .vision.capture import capture
+from .vision.templates import Templates
+from .vision.screen_cache import ScreenCache
+
+def resource_path(relative_path: str) -> str:
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.dirname(os.path.abspath(getattr(__main__, '__file__', sys.argv[0])))
+    return os.path.join(base_path, relative_path)
+
+config_path = resource_path("settings/config.cfg")
+lang_dir = resource_path("lang")
+images_dir = resource_path("modules/voice/images")
+
+config = configparser.ConfigParser()
+config.read(config_path)
+
+lang_file = os.path.join(lang_dir, f"{config.get('General', 'lang', fallback='en_US')}.json")
+with open(lang_file, 'r', encoding='utf-8') as f:
+    lang = json.load(f)
+
+matcher = Matcher()
+templates = Templates(images_dir)
+screen_cache = ScreenCache(matcher)
+
+def warm_up():
+    # Called by the registry prewarm, the first press won't read any image
+    templates.preload()
+
+def press(place):
+    system = platform.system()
+
+    # Several targets can be asked at once ("play next"), they share one capture
+    names = [place.lower().strip()]
+    if templates.get(names[0]) is None:
+        names = [n for n in re.split(r"[\s,]+", names[0]) if n]
+
+    try:
+        # -----------------------------
+        # Lecture des templates
+        # -----------------------------
+        targets = templates.get_many(names)
+        if not targets or None in targets.values():
+            return lang["patern unreadable"]
+
+        # -----------------------------
+        # Capture d'écran (en mémoire)
+        # -----------------------------
+        screen, origin = capture.grab()
+        if screen is None:
+            if system not in ("Linux", "Windows"):
+                return f"{lang['screenshot not supported']} ({system})"
+            return lang["screenshot unreadable"]
+
+        # -----------------------------
+        # Multi-scale Template Matching
+        # -----------------------------
+        found = screen_cache.locate(screen, targets)
+
+        # -----------------------------
+        # Clic si trouvé
+        # -----------------------------
+        messages = []
+        for target in names:
+            label = place if len(names) == 1 else target
+            if found[target]:
+                center_x, center_y = found[target].center
+                pyautogui.click(origin[0] + center_x, origin[1] + center_y)
+                messages.append(f"{label} {lang['clicked']}.")
+            else:
+                messages.append(f"{label} {lang['not found']}.")
+
+        return " ".join(messages)
+
+    except Exception as e:
+        return lang.get("screenshot error", str(e))
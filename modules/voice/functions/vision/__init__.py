@@ -0,0 +1 @@
+# Screen helpers used by the action functions (not registered as actions)
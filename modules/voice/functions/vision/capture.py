@@ -0,0 +1,84 @@
+import platform
+import subprocess
+import threading
+import numpy as np
+import cv2
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+system = platform.system()
+
+
+class Capture():
+    """
+    Capture d'écran directement en mémoire (tableau NumPy BGR),
+    sans encodage ni décodage PNG.
+    Repli sur flameshot (Linux, Wayland) ou pyautogui (Windows).
+    """
+
+    def __init__(self, display=None):
+        self.display = display  # X display, e.g. ":99" for an Xvfb server
+        self.local = threading.local()  # mss handles can't be shared between threads
+
+    def grabber(self):
+        if mss is None:
+            return None
+        if not hasattr(self.local, "sct"):
+            if self.display and system == "Linux":
+                self.local.sct = mss.mss(display=self.display)
+            else:
+                self.local.sct = mss.mss()
+        return self.local.sct
+
+    def monitors(self):
+        sct = self.grabber()
+        if sct is None:
+            return []
+        return sct.monitors[1:]
+
+    def grab(self, region=None, monitor=None):
+        """
+        region : (x, y, largeur, hauteur) en coordonnées écran.
+        monitor : index de l'écran (1 = premier), None pour tout le bureau.
+        Retourne (image BGR ou BGRA, (x, y) du coin haut gauche) ou (None, None).
+        """
+        try:
+            sct = self.grabber()
+            if sct is not None:
+                return self.grab_mss(sct, region, monitor)
+        except Exception as e:
+            # No X server (Wayland...), use the external tools
+            print(e)
+        return self.grab_fallback(region)
+
+    def grab_mss(self, sct, region, monitor):
+        if region:
+            x, y, w, h = region
+            area = {"left": int(x), "top": int(y), "width": int(w), "height": int(h)}
+        else:
+            area = sct.monitors[monitor or 0]
+        shot = sct.grab(area)
+        # BGRA buffer wrapped as is, the matcher converts to gray itself
+        return np.asarray(shot), (area["left"], area["top"])
+
+    def grab_fallback(self, region):
+        if system == "Linux":
+            result = subprocess.run(["flameshot", "full", "--raw"], stdout=subprocess.PIPE, check=True)
+            image = cv2.imdecode(np.frombuffer(result.stdout, np.uint8), cv2.IMREAD_COLOR)
+        elif system == "Windows":
+            import pyautogui
+            image = cv2.cvtColor(np.asarray(pyautogui.screenshot()), cv2.COLOR_RGB2BGR)
+        else:
+            return None, None
+        if image is None:
+            return None, None
+        if region:
+            x, y, w, h = (int(v) for v in region)
+            return image[y:y + h, x:x + w], (x, y)
+        return image, (0, 0)
+
+
+capture = Capture()
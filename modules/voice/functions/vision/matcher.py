@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import cv2
+import numpy as np
+
+# OpenCV releases the GIL, so scales really run in parallel
+executor = ThreadPoolExecutor(max_workers=4)
+
+
+class Match():
+    def __init__(self, score, x, y, w, h, scale):
+        self.score = score
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.scale = scale
+
+    @property
+    def center(self):
+        return self.x + self.w // 2, self.y + self.h // 2
+
+
+def to_gray(image):
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+class Template():
+    """
+    Image modèle en niveaux de gris, avec ses versions redimensionnées en cache.
+    """
+
+    def __init__(self, image, name=""):
+        self.name = name
+        self.image = to_gray(image)
+        self.sizes = {}
+        self.lock = threading.Lock()
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    def resized(self, factor):
+        key = round(factor, 5)
+        with self.lock:
+            cached = self.sizes.get(key)
+        if cached is None:
+            cached = cv2.resize(self.image, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+            with self.lock:
+                self.sizes[key] = cached
+        return cached
+
+
+class Pyramid():
+    """
+    Capture d'écran en niveaux de gris, réduite par 2 à chaque niveau.
+    """
+
+    def __init__(self, screen, levels=3):
+        self.levels = [to_gray(screen)]
+        for _ in range(levels - 1):
+            self.levels.append(cv2.pyrDown(self.levels[-1]))
+
+    @property
+    def full(self):
+        return self.levels[0]
+
+
+class Matcher():
+    """
+    Recherche multi-échelle grossière puis fine :
+    toutes les échelles sur la pyramide réduite au 1/4, en parallèle,
+    puis affinage en pleine résolution autour des meilleurs candidats.
+    Les échelles couvrent seulement les tailles plausibles à l'écran (sizes, en pixels).
+    """
+
+    def __init__(self, sizes=(16, 256), steps=24, threshold=0.9, top=3, coarse_level=2, min_size=4):
+        self.sizes = sizes  # smallest and biggest on-screen side of an element
+        self.steps = steps
+        self.threshold = threshold
+        self.top = top
+        self.coarse_level = coarse_level  # 2: search at 1/4 of the capture
+        self.min_size = min_size  # smallest template side worth matching at the coarse level
+
+    def scales(self, template):
+        side = max(template.shape[:2])
+        low = self.sizes[0] / side
+        high = max(low, min(self.sizes[1] / side, 2.0))
+        return list(np.geomspace(low, high, self.steps))
+
+    def step(self, template):
+        scales = self.scales(template)
+        return (scales[1] / scales[0]) ** 0.5 if len(scales) > 1 and scales[1] > scales[0] else 1.0
+
+    def coarse(self, pyramid, template, scale):
+        # Always on a reduced level, full resolution is only for refine().
+        # Level 0 is only used when the capture itself is a small crop.
+        for level in range(min(self.coarse_level, len(pyramid.levels) - 1), -1, -1):
+            factor = scale / 2 ** level
+            screen = pyramid.levels[level]
+            h, w = (round(d * factor) for d in template.shape[:2])
+            if min(h, w) >= self.min_size and h <= screen.shape[0] and w <= screen.shape[1]:
+                break
+        else:
+            return None
+        resized = template.resized(factor)
+        if resized.shape[0] > screen.shape[0] or resized.shape[1] > screen.shape[1]:
+            return None
+        result = cv2.matchTemplate(screen, resized, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, (max_loc[0] * 2 ** level, max_loc[1] * 2 ** level), scale
+
+    def refine(self, screen, template, candidate, margin=None):
+        _, (x, y), scale = candidate
+        best = None
+        step = self.step(template)
+        for s in (scale / step, scale, scale * step):
+            resized = template.resized(s)
+            h, w = resized.shape[:2]
+            if min(h, w) < 4:
+                continue
+            pad = margin if margin is not None else max(h, w) // 2 + 8
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            x1, y1 = min(screen.shape[1], x + w + pad), min(screen.shape[0], y + h + pad)
+            region = screen[y0:y1, x0:x1]
+            if h > region.shape[0] or w > region.shape[1]:
+                continue
+            result = cv2.matchTemplate(region, resized, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if best is None or max_val > best.score:
+                best = Match(max_val, x0 + max_loc[0], y0 + max_loc[1], w, h, s)
+        return best
+
+    def find(self, screen, template, pyramid=None):
+        """
+        Retourne le meilleur Match au-dessus du seuil, ou None.
+        Une Pyramid déjà construite peut être passée pour réutiliser la capture.
+        """
+        return self.find_all(screen, {"": template}, pyramid)[""]
+
+    def find_all(self, screen, templates, pyramid=None):
+        """
+        Cherche plusieurs modèles {nom: Template ou image} sur une seule capture,
+        en un seul passage dans le pool. Retourne {nom: Match ou None}.
+        """
+        if pyramid is None:
+            pyramid = Pyramid(screen)
+        templates = {
+            name: t if isinstance(t, Template) else Template(t, name)
+            for name, t in templates.items()
+        }
+
+        jobs = [(name, scale) for name, template in templates.items() for scale in self.scales(template)]
+        coarse = executor.map(lambda job: self.coarse(pyramid, templates[job[0]], job[1]), jobs)
+        candidates = {name: [] for name in templates}
+        for (name, _), candidate in zip(jobs, coarse):
+            if candidate:
+                candidates[name].append(candidate)
+
+        jobs = []
+        for name, found in candidates.items():
+            found.sort(key=lambda c: c[0], reverse=True)
+            jobs.extend((name, c) for c in found[:self.top])
+        refined = executor.map(lambda job: self.refine(pyramid.full, templates[job[0]], job[1]), jobs)
+
+        results = {name: None for name in templates}
+        for (name, _), match in zip(jobs, refined):
+            if match and match.score >= self.threshold:
+                if results[name] is None or match.score > results[name].score:
+                    results[name] = match
+        return results
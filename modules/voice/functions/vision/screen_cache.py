@@ -0,0 +1,115 @@
+import threading
+import cv2
+import numpy as np
+from .matcher import Match, Pyramid
+
+
+class ScreenCache():
+    """
+    Mémoire de l'écran entre deux recherches :
+    - vérifie d'abord la dernière position connue de chaque modèle (petite zone),
+    - compare la capture à la précédente par tuiles,
+    - ne recherche que dans les tuiles qui ont changé.
+    """
+
+    def __init__(self, matcher, tile=64, tolerance=2.0, max_changed=0.5, margin=256):
+        self.matcher = matcher
+        self.tile = tile  # tile side in full resolution pixels
+        self.tolerance = tolerance  # mean gray difference for a tile to count as changed
+        self.max_changed = max_changed  # above this share of changed tiles, search everything
+        self.margin = margin  # around changed tiles, when the template size is unknown
+        self.frame = 0
+        self.previous = None  # reduced gray image of the last capture
+        self.known = {}  # name -> (frame, Match or None)
+        self.lock = threading.Lock()
+        # stats
+        self.location_hits = 0
+        self.partial_searches = 0
+        self.full_searches = 0
+
+    def signature(self, pyramid):
+        # Tiles averaged down to one value each: a cheap block hash
+        gray = pyramid.full
+        rows, cols = gray.shape[0] // self.tile, gray.shape[1] // self.tile
+        if not rows or not cols:
+            return None
+        cropped = gray[:rows * self.tile, :cols * self.tile]
+        return cv2.resize(cropped, (cols, rows), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def changed_box(self, signature):
+        """
+        Retourne (x, y, largeur, hauteur) englobant les tuiles modifiées,
+        None si rien n'a changé, ou "all" s'il faut tout rechercher.
+        """
+        if self.previous is None or signature is None or signature.shape != self.previous.shape:
+            return "all"
+        changed = np.abs(signature - self.previous) > self.tolerance
+        if not changed.any():
+            return None
+        if changed.mean() > self.max_changed:
+            return "all"
+        rows, cols = np.nonzero(changed)
+        x0, y0 = cols.min() * self.tile, rows.min() * self.tile
+        x1, y1 = (cols.max() + 1) * self.tile, (rows.max() + 1) * self.tile
+        return x0, y0, x1 - x0, y1 - y0
+
+    def check_location(self, pyramid, template, match):
+        found = self.matcher.refine(pyramid.full, template, (match.score, (match.x, match.y), match.scale), margin=8)
+        if found and found.score >= self.matcher.threshold:
+            return found
+        return None
+
+    def search_box(self, screen, templates, box, margin):
+        x, y, w, h = box
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(screen.shape[1], x + w + margin), min(screen.shape[0], y + h + margin)
+        results = self.matcher.find_all(screen[y0:y1, x0:x1], templates)
+        for name, match in results.items():
+            if match:
+                results[name] = Match(match.score, match.x + x0, match.y + y0, match.w, match.h, match.scale)
+        return results
+
+    def locate(self, screen, templates):
+        """
+        Comme Matcher.find_all, en réutilisant ce qui est connu des captures précédentes.
+        """
+        with self.lock:
+            pyramid = Pyramid(screen)
+            signature = self.signature(pyramid)
+            box = self.changed_box(signature)
+            last_frame = self.frame
+            results = {}
+            full, partial = {}, {}
+
+            for name, template in templates.items():
+                frame, match = self.known.get(name, (None, None))
+                if match:
+                    found = self.check_location(pyramid, template, match)
+                    if found:
+                        self.location_hits += 1
+                        results[name] = found
+                        continue
+                if frame != last_frame or box == "all":
+                    full[name] = template
+                elif box is None:
+                    results[name] = None  # nothing changed since it was searched
+                else:
+                    partial[name] = template
+
+            if full:
+                self.full_searches += len(full)
+                results.update(self.matcher.find_all(screen, full, pyramid))
+            if partial:
+                self.partial_searches += len(partial)
+                margin = max(
+                    (m.w + m.h for _, m in (self.known[n] for n in partial) if m),
+                    default=self.margin
+                )
+                results.update(self.search_box(screen, partial, box, margin))
+
+            # Targets not looked up this time keep an older frame and get a full search next time
+            self.frame += 1
+            self.previous = signature
+            for name in templates:
+                self.known[name] = (self.frame, results.get(name))
+            return results
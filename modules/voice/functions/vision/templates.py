@@ -0,0 +1,61 @@
+import os
+import threading
+import cv2
+from .matcher import Template
+
+
+class Templates():
+    """
+    Registre des images modèles : chargées une fois (au pré-chargement ou à la première utilisation),
+    gardées en mémoire avec leurs tailles en cache, rechargées si le fichier change.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.templates = {}  # name -> (mtime, Template)
+        self.lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.folder, f"{name}.png")
+
+    def names(self):
+        try:
+            return sorted(f[:-4] for f in os.listdir(self.folder) if f.lower().endswith(".png"))
+        except OSError:
+            return []
+
+    def load(self, name):
+        path = self.path(name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            with self.lock:
+                self.templates.pop(name, None)
+            return None
+        with self.lock:
+            cached = self.templates.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        image = cv2.imread(path)
+        if image is None:
+            return None
+        template = Template(image, name)
+        with self.lock:
+            self.templates[name] = (mtime, template)
+        return template
+
+    def preload(self):
+        """
+        Charge toutes les images du dossier (pré-chargement de press).
+        """
+        for name in self.names():
+            self.load(name)
+
+    def get(self, name):
+        """
+        Retourne le Template pour ce nom (ex : "play"), ou None.
+        """
+        return self.load(name.lower().strip())
+
+    def get_many(self, names):
+        return {name: self.get(name) for name in names}
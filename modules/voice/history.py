@@ -0,0 +1,89 @@
+import threading
+
+
+class History():
+    """
+    Historique de conversation borné en tokens.
+    Garde le prompt système et les derniers tours tels quels,
+    les tours plus anciens sont résumés en arrière-plan.
+    """
+
+    def __init__(self, system_prompt, summarize=None, budget=2048, keep_turns=4):
+        self.system_prompt = system_prompt
+        self.summarize = summarize  # callable(text) -> str
+        self.budget = budget
+        self.keep_turns = max(1, keep_turns)
+        self.summary = ""
+        self.turns = []    # [(prompt, response), ...]
+        self.folding = []  # old turns being summarized
+        self.lock = threading.Lock()
+        self.worker = None
+
+    @staticmethod
+    def count_tokens(text):
+        # Rough estimate, good enough to keep the prompt bounded
+        return len(text) // 4 + 1
+
+    def messages(self):
+        with self.lock:
+            # The system prompt stays byte-identical so the server can reuse its evaluation
+            messages = [{"role": "system", "content": self.system_prompt}]
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+            for prompt, response in self.folding + self.turns:
+                messages.append({"role": "user", "content": prompt})
+                messages.append({"role": "assistant", "content": response})
+        return messages
+
+    def transcript(self):
+        """
+        L'historique en un seul texte, pour repartir d'un contexte vide.
+        """
+        lines = [m["content"] if m["role"] == "system" else f"{m['role'].capitalize()}: {m['content']}" for m in self.messages()]
+        return "\n".join(lines)
+
+    def tokens(self):
+        return sum(self.count_tokens(m["content"]) for m in self.messages())
+
+    def add(self, prompt, response):
+        with self.lock:
+            self.turns.append((prompt, response))
+        self.trim()
+
+    def trim(self):
+        if self.tokens() <= self.budget:
+            return
+        with self.lock:
+            if self.worker and self.worker.is_alive():
+                return
+            if len(self.turns) <= self.keep_turns:
+                return
+            self.folding = self.turns[:-self.keep_turns]
+            self.turns = self.turns[-self.keep_turns:]
+        self.worker = threading.Thread(target=self.fold, daemon=True)
+        self.worker.start()
+
+    def fold(self):
+        with self.lock:
+            old = list(self.folding)
+            summary = self.summary
+        text = "\n".join(f"User: {p}\nAssistant: {r}" for p, r in old)
+        if summary:
+            text = f"{summary}\n{text}"
+
+        new_summary = None
+        if self.summarize:
+            try:
+                new_summary = self.summarize(text)
+            except Exception as e:
+                print(e)
+        if not new_summary:
+            # Without the model, keep only what the user asked
+            new_summary = " ".join([summary] + [p for p, _ in old]).strip()
+
+        # The summary must not eat the whole budget (about a quarter of it)
+        new_summary = new_summary.strip()[-self.budget:]
+
+        with self.lock:
+            self.summary = new_summary
+            self.folding = []
@@ -0,0 +1,169 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+
+
+class HistoryLog():
+    """
+    Journal des échanges en JSONL, écrit par lots sur un thread à part.
+    Le fichier courant est archivé (gzip) quand il dépasse max_bytes ou change de jour,
+    et un petit index (jour -> fichiers, action -> nombre par jour) évite de tout relire.
+    """
+
+    def __init__(self, folder, name="history", max_bytes=5 * 1024 * 1024, batch=32):
+        self.folder = folder
+        self.name = name
+        self.path = os.path.join(folder, f"{name}.jsonl")
+        self.index_path = os.path.join(folder, f"{name}.index.json")
+        self.max_bytes = max_bytes
+        self.batch = batch
+        self.queue = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        self.index = None
+
+    def configure(self, max_bytes):
+        self.max_bytes = max_bytes
+
+    def write(self, record):
+        """
+        Ajoute un enregistrement sans attendre le disque.
+        """
+        record.setdefault("time", datetime.now().isoformat(timespec="milliseconds"))
+        self.queue.put(record)
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, daemon=True)
+                self.worker.start()
+
+    def flush(self):
+        """
+        Attend que tout ce qui a été ajouté soit écrit.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            self.queue.join()
+
+    def run(self):
+        if self.index is None:
+            self.index = self.load_index()
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.append(records)
+            except Exception as e:
+                print(e)
+            finally:
+                for _ in records:
+                    self.queue.task_done()
+
+    def append(self, records):
+        os.makedirs(self.folder, exist_ok=True)
+        day = records[0]["time"][:10]
+        if self.should_rotate(day):
+            self.rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        for record in records:
+            self.add_to_index(os.path.basename(self.path), record)
+        self.save_index()
+
+    def should_rotate(self, day):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return False
+        if size >= self.max_bytes:
+            return True
+        current = self.index.get("current")
+        return current is not None and current != day
+
+    def rotate(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        archive = os.path.join(self.folder, f"{self.name}-{stamp}.jsonl.gz")
+        count = 1
+        while os.path.exists(archive):
+            archive = os.path.join(self.folder, f"{self.name}-{stamp}-{count}.jsonl.gz")
+            count += 1
+        with open(self.path, 'rb') as src, gzip.open(archive, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        # The index entries of the current file now point to the archive
+        current = os.path.basename(self.path)
+        archived = os.path.basename(archive)
+        for files in self.index["dates"].values():
+            if current in files:
+                files[files.index(current)] = archived
+        self.index["current"] = None
+
+    def add_to_index(self, filename, record):
+        day = record["time"][:10]
+        self.index["current"] = day
+        files = self.index["dates"].setdefault(day, [])
+        if filename not in files:
+            files.append(filename)
+        for action in record.get("actions", []):
+            days = self.index["actions"].setdefault(action, {})
+            days[day] = days.get(day, 0) + 1
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"current": None, "dates": {}, "actions": {}}
+
+    def save_index(self):
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def read(self, filename):
+        path = os.path.join(self.folder, filename)
+        opener = gzip.open if filename.endswith(".gz") else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except OSError:
+            return
+
+    def query(self, day=None, action=None):
+        """
+        Enregistrements d'un jour ("YYYY-MM-DD") et/ou d'une action, en ne lisant que les fichiers concernés.
+        """
+        self.flush()
+        index = self.load_index()
+        days = list(index["dates"])
+        if day:
+            days = [d for d in days if d == day]
+        if action:
+            days = [d for d in days if d in index["actions"].get(action, {})]
+        files = []
+        for d in sorted(days):
+            files += [f for f in index["dates"][d] if f not in files]
+        for filename in files:
+            for record in self.read(filename):
+                if day and not record["time"].startswith(day):
+                    continue
+                if action and action not in record.get("actions", []):
+                    continue
+                yield record
+
+    def counts(self, action):
+        """
+        Nombre d'utilisations d'une action par jour, lu dans l'index seulement.
+        """
+        self.flush()
+        return dict(self.load_index()["actions"].get(action, {}))
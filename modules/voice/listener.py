@@ -3,13 +3,17 @@ import sys
 import json
 import time
 import queue
+import threading
+from collections import deque
 import configparser
 import sounddevice as sd
-from vosk import Model, KaldiRecognizer, SetLogLevel
-from PySide6.QtCore import QThread, Signal, Qt, QTimer
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton, QMessageBox
-from PySide6.QtGui import QFont
+from vosk import KaldiRecognizer, SetLogLevel
+from PySide6.QtCore import QThread, Signal
 from .brain import Brain
+from .pipeline import BoundedQueue
+from .models import vosk_models
+from .tracing import tracer
+from .frontend import Frontend, Resampler, Gain, VAD, model_samplerate, device_samplerate
 import __main__
 
 
@@ -49,16 +53,57 @@ class ListenerThread(QThread):
             self.brain = Brain(log_signal=self.log_signal)
             self.hotword = self.brain.hotword
             self.speaker = self.brain.speaker
-            self.q = queue.Queue()
-
-            self.model = Model(model_path)
-            self.recognizer = KaldiRecognizer(self.model, 48000)
+            # The LLM loads while the Vosk model does
+            self.brain.warm_up()
+
+            # Loaded once per process, starting again reuses it
+            vosk_models.configure(
+                config.get("Voice", "vosk_policy", fallback="keep"),
+                config.getfloat("Voice", "vosk_idle_minutes", fallback=10) * 60
+            )
+            self.model_path = model_path
+            self.model = vosk_models.acquire(model_path)
+            # Capture at the device rate, decode at the model rate
+            self.device_samplerate = device_samplerate()
+            self.samplerate = model_samplerate(model_path)
+            self.blocksize = self.device_samplerate // 6
+            self.frontend = self.build_frontend(config)
+            self.recognizer = KaldiRecognizer(self.model, self.samplerate)
+
+            # First stage: cheap recognizer that only knows the hotword
+            self.hotword_recognizer = None
+            if config.getboolean("Voice", "hotword_spotting", fallback=True):
+                grammar = json.dumps([self.hotword, "[unk]"], ensure_ascii=False)
+                self.hotword_recognizer = KaldiRecognizer(self.model, self.samplerate, grammar)
+            preroll = config.getfloat("Voice", "preroll", fallback=1.5)
+            self.preroll = deque(maxlen=max(1, int(preroll * self.device_samplerate / self.blocksize)))
+            self.command_timeout = config.getfloat("Voice", "command_timeout", fallback=10)
+
+            # capture -> recognize -> brain -> speak, each stage behind a bounded queue
+            audio_seconds = config.getfloat("Voice", "audio_queue", fallback=2)
+            self.q = BoundedQueue("audio", max(1, int(audio_seconds * self.device_samplerate / self.blocksize)), "drop_oldest")
+            self.commands = BoundedQueue("commands", config.getint("Voice", "command_queue", fallback=3), "drop_oldest")
+            # Per utterance spans, written as a Chrome trace in logs/traces
+            if config.getboolean("Voice", "trace", fallback=False):
+                tracer.start(
+                    os.path.join(log_dir, "traces"),
+                    config.getint("Voice", "trace_window", fallback=200),
+                    max_bytes=config.getint("Voice", "trace_mb", fallback=10) * 1024 * 1024,
+                    keep=config.getint("Voice", "trace_files", fallback=5)
+                )
+            self.arrived = None  # arrival of the audio block being decoded
+            self.decoded = None  # (start, end) of the last full model decode
+            self.hotword_at = None
+            self.speech_start = None
+            self.speaker.listeners.append(self.on_speech)
+            self.brain_thread = threading.Thread(target=self.brain_loop, daemon=True)
+            self.brain_thread.start()
 
             if not self.brain.cancel:
                 self.log_signal.emit(self.lang["say Athena"])
                 self.stream = sd.RawInputStream(
-                    samplerate=48000,
-                    blocksize=8000,
+                    samplerate=self.device_samplerate,
+                    blocksize=self.blocksize,
                     dtype="int16",
                     channels=1,
                     callback=self.audio_callback
@@ -69,161 +114,175 @@ class ListenerThread(QThread):
             else:
                 self.end()
         except Exception as e:
+            self.release_model()
             self.log_signal.emit(f"❌ {str(e)}")
             self.finished_signal.emit(False)
 
+    def release_model(self):
+        if getattr(self, "model", None) is not None:
+            self.model = None
+            vosk_models.release(self.model_path)
+
+    def build_frontend(self, config):
+        stages = [Resampler(self.device_samplerate, self.samplerate)]
+        if config.getboolean("Voice", "vad", fallback=True):
+            stages.append(VAD(
+                self.samplerate,
+                energy_db=config.getfloat("Voice", "vad_threshold", fallback=-45.0)
+            ))
+        if config.getboolean("Voice", "normalize", fallback=True):
+            stages.append(Gain())
+        return Frontend(self.device_samplerate, self.samplerate, stages)
+
     def audio_callback(self, indata, frames, time_info, status):
         if status:
             self.log_signal.emit(f"⚠️ {status}")
         if not self.brain.cancel:
-            self.q.put(bytes(indata))
+            self.q.put((time.perf_counter(), bytes(indata)))
 
     def recognize_loop(self):
+        listening_since = None  # set while the full model decodes a command
         while not self.brain.cancel:
             try:
-                data = self.q.get(timeout=0.1)
+                self.arrived, data = self.q.get(timeout=0.1)
             except queue.Empty:
                 continue
 
-            if self.recognizer.AcceptWaveform(data):
-                result = json.loads(self.recognizer.Result())
+            data = self.frontend.process(data)
+            if data is None:
+                continue
+
+            if self.hotword_recognizer is None:
+                text = self.recognize(data)
+                if text and self.hotword and self.hotword in text:
+                    self.handle(text)
+                continue
+
+            if listening_since is None:
+                self.preroll.append(data)
+                if self.spot_hotword(data):
+                    self.hotword_at = time.perf_counter()
+                    # Full model starts a bit before the hotword
+                    self.recognizer.Reset()
+                    listening_since = time.time()
+                    for block in self.preroll:
+                        text = self.recognize(block)
+                        # Chatter ending before the hotword is ignored
+                        if text and self.hotword in text:
+                            self.handle(text)
+                            listening_since = None
+                            break
+                    self.preroll.clear()
+                continue
+
+            text = self.recognize(data)
+            if text is None and time.time() - listening_since > self.command_timeout:
+                start = time.perf_counter()
+                result = json.loads(self.recognizer.FinalResult())
                 text = result.get("text", "").strip().lower()
-                if text:
-                    if self.hotword and self.hotword in text:
-                        self.log_signal.emit(f"🗣️ {text}")
-                        self.speaker.stop()
-                        self.brain.agent_loop(text)
+                self.decoded = (start, time.perf_counter())
+            if text is not None:
+                # The grammar recognizer can spot the hotword in anything,
+                # the full model has to hear it too
+                if self.hotword in text:
+                    self.handle(text)
+                else:
+                    self.hotword_at = None
+                listening_since = None
+                self.hotword_recognizer.Reset()
 
         self.end()
 
+    def spot_hotword(self, data):
+        if self.hotword_recognizer.AcceptWaveform(data):
+            result = json.loads(self.hotword_recognizer.Result())
+            text = result.get("text", "")
+        else:
+            result = json.loads(self.hotword_recognizer.PartialResult())
+            text = result.get("partial", "")
+        if self.hotword in text:
+            self.hotword_recognizer.Reset()
+            return True
+        return False
+
+    def recognize(self, data):
+        """
+        Décode un bloc avec le modèle complet, retourne le texte si une phrase est terminée.
+        """
+        start = time.perf_counter()
+        if not self.recognizer.AcceptWaveform(data):
+            return None
+        result = json.loads(self.recognizer.Result())
+        self.decoded = (start, time.perf_counter())
+        return result.get("text", "").strip().lower()
+
+    def handle(self, text):
+        if text:
+            self.log_signal.emit(f"🗣️ {text}")
+            # The turn still running (if any) stops talking and reading Ollama
+            self.brain.interrupt()
+            self.speaker.stop()
+            utterance = self.trace_recognition(text)
+            self.commands.put((utterance, text))
+
+    def trace_recognition(self, text):
+        if not tracer.enabled or self.arrived is None:
+            return None
+        utterance = tracer.begin(self.arrived, text)
+        if self.decoded:
+            decode_start, decode_end = self.decoded
+            tracer.span("audio block", "audio", utterance, self.arrived, decode_start)
+            tracer.span("vosk final", "recognition", utterance, decode_start, decode_end)
+        if self.hotword_at is not None:
+            tracer.span("hotword to final", "recognition", utterance, self.hotword_at)
+            self.hotword_at = None
+        else:
+            tracer.instant("hotword", "recognition", utterance)
+        return utterance
+
+    def on_speech(self, event, text, utterance):
+        # Called by the speaker thread, utterance is the command being answered
+        if event == "start":
+            self.speech_start = time.perf_counter()
+            tracer.heard(utterance, self.speech_start)
+        elif self.speech_start is not None:
+            tracer.span("speak", "speaker", utterance, self.speech_start, cancelled=event == "cancel")
+            self.speech_start = None
+
+    def brain_loop(self):
+        # Runs next to recognition, so a slow LLM never stalls the audio
+        while not self.brain.cancel:
+            try:
+                utterance, text = self.commands.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            tracer.current = utterance
+            start = time.perf_counter()
+            try:
+                self.brain.agent_loop(text)
+            except Exception as e:
+                self.log_signal.emit(f"❌ {str(e)}")
+            tracer.span("brain", "brain", utterance, start)
+
+    def metrics(self):
+        return "\n".join([
+            self.q.metrics(),
+            self.commands.metrics(),
+            self.speaker.queue.metrics(),
+            self.brain.responses.report(),
+            self.brain.router.report()
+        ])
+
     def end(self):
+        if hasattr(self, "commands"):
+            self.log_signal.emit(f"<pre>{self.metrics()}</pre>")
         self.speaker.stop()
+        if self.on_speech in self.speaker.listeners:
+            self.speaker.listeners.remove(self.on_speech)
+        self.brain.release()
+        self.release_model()
         self.log_signal.emit(self.lang["stop Athena"])
         if hasattr(self, "stream") and self.stream:
             self.stream.stop()
             self.stream.close()
         self.finished_signal.emit(True)
-
-
-class ListenerUI(QWidget):
-
-    def __init__(self):
-        super().__init__()
-
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
-        self.lang = {}
-        self.load_language()
-
-        layout = QVBoxLayout()
-        self.resize(600, 800)
-
-
-        self.label = QLabel(f"<h2>{self.lang['listener title']}</h2>")
-        self.label.setAccessibleDescription(self.lang["listener title"])
-        self.label.setFocusPolicy(Qt.StrongFocus)
-        layout.addWidget(self.label)
-
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
-        self.log.setAccessibleName(self.lang["text logs"])
-        self.log.setFocusPolicy(Qt.StrongFocus)
-        layout.addWidget(self.log)
-
-        self.start_button = QPushButton(self.lang["start listening"])
-        self.start_button.setAccessibleDescription(self.lang["start listening"])
-        self.start_button.clicked.connect(self.start_listening)
-        self.start_button.setFocusPolicy(Qt.StrongFocus)
-        layout.addWidget(self.start_button)
-
-        self.stop_button = QPushButton(self.lang["stop listening"])
-        self.stop_button.setAccessibleDescription(self.lang["stop listening"])
-        self.stop_button.clicked.connect(self.stop_listening)
-        self.stop_button.setFocusPolicy(Qt.StrongFocus)
-        layout.addWidget(self.stop_button)
-
-        self.setLayout(layout)
-
-        self.listener_thread = None
-
-        # Style
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #000000;
-                color: #FFFF00;
-                font-family: Arial, sans-serif;
-            }
-            QLabel {
-                padding: 15px;
-            }
-            QLabel:focus {
-                border: 4px solid #FFA500;
-                outline: none;
-            }
-            QPushButton {
-                background-color: #0000FF;
-                color: #FFFFFF;
-                border: 3px solid #FFFFFF;
-                border-radius: 8px;
-                padding: 15px;
-            }
-            QPushButton:focus {
-                border: 4px solid #FFA500;
-            }
-            QPushButton:hover {
-                background-color: #1E90FF;
-            }
-            QTextEdit {
-                background-color: #111111;
-                color: #00FF00;
-                border: 2px solid #FFFFFF;
-            }
-            QTextEdit:focus {
-                border: 4px solid #FFA500;
-            }
-        """)
-
-    def load_language(self):
-        lang_code = self.config.get("General", "lang", fallback="en_US")
-        lang_file = os.path.join(lang_dir, f"{lang_code}.json")
-        with open(lang_file, "r", encoding="utf-8") as f:
-            self.lang = json.load(f)
-
-    def append_log(self, message):
-        self.log.append(message)
-        self.log.ensureCursorVisible()
-        self.log.verticalScrollBar().setValue(self.log.verticalScrollBar().maximum())
-
-    def start_listening(self):
-        self.start_button.setEnabled(False)
-        self.log.clear()
-        self.append_log(self.lang["starting"])
-
-        self.listener_thread = ListenerThread(self.lang)
-        self.listener_thread.log_signal.connect(self.append_log)
-        self.listener_thread.finished_signal.connect(self.on_listening_finished)
-        self.listener_thread.start()
-
-    def stop_listening(self):
-        if self.listener_thread and self.listener_thread.isRunning():
-            self.listener_thread.brain.cancel = True
-            self.listener_thread.speaker.stop()
-            self.listener_thread.wait()
-            self.start_button.setEnabled(True)
-
-    def closeEvent(self, event):
-        self.stop_listening()
-
-    def on_listening_finished(self, success):
-        self.start_button.setEnabled(True)
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        size = self.height() // 15
-        font = QFont("Arial", size)
-        if not font.exactMatch():
-            font = QFont("Sans Serif", size)
-        self.label.setFont(font)
-        self.log.setFont(font)
-        self.start_button.setFont(font)
-        self.stop_button.setFont(font)
@@ -0,0 +1,76 @@
+import threading
+from vosk import Model, SetLogLevel
+
+
+class ModelManager():
+    """
+    Modèles Vosk partagés par tout le processus : chargés une seule fois,
+    gardés entre deux écoutes et libérés seulement selon la politique choisie :
+    - "keep" : jamais (défaut),
+    - "release" : dès que plus personne ne s'en sert,
+    - "idle" : après idle_timeout secondes sans utilisation.
+    """
+
+    def __init__(self, policy="keep", idle_timeout=600):
+        self.policy = policy
+        self.idle_timeout = idle_timeout
+        self.models = {}  # path -> Model
+        self.users = {}  # path -> number of listeners using it
+        self.locks = {}  # path -> lock held while loading
+        self.timers = {}  # path -> pending idle unload
+        self.lock = threading.Lock()
+
+    def configure(self, policy, idle_timeout):
+        with self.lock:
+            self.policy = policy
+            self.idle_timeout = idle_timeout
+
+    def load(self, path):
+        """
+        Retourne le modèle, en le chargeant s'il ne l'est pas encore.
+        Deux appels simultanés ne le chargent qu'une fois.
+        """
+        with self.lock:
+            lock = self.locks.setdefault(path, threading.Lock())
+        with lock:
+            model = self.models.get(path)
+            if model is None:
+                SetLogLevel(-1)
+                model = Model(path)
+                with self.lock:
+                    self.models[path] = model
+            return model
+
+    def acquire(self, path):
+        with self.lock:
+            timer = self.timers.pop(path, None)
+        if timer:
+            timer.cancel()
+        # Counted only once loaded, a failed load must not keep the model forever
+        model = self.load(path)
+        with self.lock:
+            self.users[path] = self.users.get(path, 0) + 1
+            self.models[path] = model  # an idle timer may have fired during the load
+        return model
+
+    def release(self, path):
+        with self.lock:
+            self.users[path] = max(0, self.users.get(path, 0) - 1)
+            if self.users[path] or path not in self.models:
+                return
+            if self.policy == "release":
+                self.models.pop(path, None)
+            elif self.policy == "idle":
+                timer = threading.Timer(self.idle_timeout, self.expire, args=(path,))
+                timer.daemon = True
+                self.timers[path] = timer
+                timer.start()
+
+    def expire(self, path):
+        with self.lock:
+            self.timers.pop(path, None)
+            if not self.users.get(path):
+                self.models.pop(path, None)
+
+
+vosk_models = ModelManager()
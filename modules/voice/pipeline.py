@@ -0,0 +1,95 @@
+import heapq
+import queue
+import threading
+from collections import deque
+
+
+class BoundedQueue():
+    """
+    File bornée entre deux étapes du pipeline, qui ne bloque jamais le producteur.
+    Quand elle est pleine :
+    - "drop_oldest" jette l'élément le plus ancien (rester en temps réel),
+    - "drop_newest" jette le nouvel élément,
+    - "coalesce" remplace tout ce qui attend par le nouvel élément.
+    """
+
+    def __init__(self, name, maxsize, policy="drop_oldest"):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.items = deque()
+        self.condition = threading.Condition()
+        # metrics
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item):
+        with self.condition:
+            self.put_count += 1
+            if len(self.items) >= self.maxsize:
+                if self.policy == "coalesce":
+                    self.dropped += len(self.items)
+                    self.items.clear()
+                else:
+                    self.dropped += 1
+                    if self.policy == "drop_newest" or not self.evict(item):
+                        return False
+            self.push(item)
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify()
+            return True
+
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.items and not self.condition.wait_for(lambda: self.items, timeout):
+                raise queue.Empty
+            return self.pop()
+
+    def push(self, item):
+        self.items.append(item)
+
+    def pop(self):
+        return self.items.popleft()
+
+    def evict(self, item):
+        # Makes room for item, False when item itself should be dropped
+        self.items.popleft()
+        return True
+
+    def clear(self):
+        with self.condition:
+            self.items.clear()
+
+    def depth(self):
+        with self.condition:
+            return len(self.items)
+
+    def metrics(self):
+        return f"{self.name}: depth {self.depth()}/{self.maxsize}, max {self.max_depth}, dropped {self.dropped}/{self.put_count}"
+
+
+class PriorityBoundedQueue(BoundedQueue):
+    """
+    BoundedQueue servie par priorité, éléments (priorité, ordre, ...) : le plus petit sort d'abord.
+    Avec "drop_oldest", c'est le plus ancien des moins urgents qui est jeté,
+    jamais un élément plus urgent que le nouveau.
+    """
+
+    def __init__(self, name, maxsize, policy="drop_oldest"):
+        super().__init__(name, maxsize, policy)
+        self.items = []  # heap
+
+    def push(self, item):
+        heapq.heappush(self.items, item)
+
+    def pop(self):
+        return heapq.heappop(self.items)
+
+    def evict(self, item):
+        victims = [i for i in self.items if i[0] >= item[0]]
+        if not victims:
+            return False
+        self.items.remove(min(victims, key=lambda i: (-i[0], i[1])))
+        heapq.heapify(self.items)
+        return True
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from .router import tokenize
+from .structured import StructuredReply
+
+
+class ResponseCache():
+    """
+    Cache persistant phrase normalisée -> réponse ACTION du LLM.
+    Seules les réponses faites uniquement d'ACTION sont gardées (déterministes).
+    Éviction LRU et TTL, vidé quand actions.json, apps.json, les actions activées
+    ou le format des réponses (texte ou JSON) changent.
+    """
+
+    def __init__(self, path, lang, sources=(), enabled_actions=(), reply_format="text", max_entries=256, ttl=7 * 24 * 3600):
+        self.path = path
+        self.hotword = lang["hotword"]
+        self.stopwords = set(lang.get("stopwords", []))
+        # Words that only say which action, "close the" and "close" both keep just these
+        self.action_words = {w for phrases in lang.get("intents", {}).values() for p in phrases for w in tokenize(p)}
+        # "close it" depends on what "it" was, the answer can't be replayed
+        anaphora = lang.get("anaphora", [])
+        self.anaphora = {w for w in anaphora if not w.startswith("-")}
+        self.enclitics = re.compile("|".join(re.escape(w) + r"\b" for w in anaphora if w.startswith("-")) or r"(?!)")
+        self.sources = list(sources)  # files the cached answers depend on
+        self.enabled_actions = sorted(enabled_actions)
+        self.reply_format = reply_format  # a text answer can't be replayed as JSON and back
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (time, response)
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.mtimes = self.source_mtimes()
+        self.fingerprint = self.compute_fingerprint()
+        self.load()
+
+    def compute_fingerprint(self):
+        digest = hashlib.sha1(f"{self.reply_format}:{','.join(self.enabled_actions)}".encode("utf-8"))
+        for source in self.sources:
+            try:
+                with open(source, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b"missing")
+        return digest.hexdigest()
+
+    def source_mtimes(self):
+        mtimes = []
+        for source in self.sources:
+            try:
+                mtimes.append(os.path.getmtime(source))
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def context_dependent(self, text):
+        return bool(self.anaphora.intersection(tokenize(text)) or self.enclitics.search(text.lower()))
+
+    def key(self, text):
+        words = [w for w in tokenize(text) if w != self.hotword and w not in self.stopwords]
+        return " ".join(words)
+
+    def specific(self, key):
+        # Without a word naming what to act on, two different phrases share the key
+        return any(w not in self.action_words for w in key.split())
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("fingerprint") != self.fingerprint:
+            return
+        now = time.time()
+        for key, (stamp, response) in data.get("entries", []):
+            if now - stamp < self.ttl:
+                self.entries[key] = (stamp, response)
+
+    def save(self):
+        with self.lock:
+            data = {"fingerprint": self.fingerprint, "entries": list(self.entries.items())}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with self.save_lock:
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(e)
+
+    def check(self):
+        # actions.json or apps.json changed: answers may be wrong now.
+        # Only a stat per file here, the files are hashed when they were touched
+        mtimes = self.source_mtimes()
+        if mtimes == self.mtimes:
+            return
+        self.mtimes = mtimes
+        fingerprint = self.compute_fingerprint()
+        if fingerprint != self.fingerprint:
+            with self.lock:
+                self.fingerprint = fingerprint
+                self.entries.clear()
+
+    @staticmethod
+    def cacheable(response):
+        response = response.strip()
+        if StructuredReply.cacheable(response):
+            return True
+        return response.startswith("ACTION:") and "\n" not in response.replace("\nACTION:", " ACTION:")
+
+    def get(self, text):
+        if self.context_dependent(text):
+            return None
+        self.check()
+        key = self.key(text)
+        if not self.specific(key):
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, text, response):
+        if not self.cacheable(response) or self.context_dependent(text):
+            return
+        key = self.key(text)
+        if not self.specific(key):
+            return
+        with self.lock:
+            self.entries[key] = (time.time(), response.strip())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        threading.Thread(target=self.save, daemon=True).start()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"response cache: {self.hits}/{total} hits ({rate:.0%}), {len(self.entries)} entries"
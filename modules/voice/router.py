@@ -0,0 +1,127 @@
+import re
+import time
+
+
+def tokenize(text):
+    return re.findall(r"[\w']+", text.lower())
+
+
+class Router():
+    """
+    Classe les commandes simples sans passer par le LLM.
+    Construit à partir de actions.json, des alias de apps.json
+    et des phrases "intents" du fichier de langue.
+    """
+
+    def __init__(self, actions, apps, lang, allowed_actions):
+        self.hotword = lang["hotword"]
+        self.stopwords = set(lang.get("stopwords", []))
+        self.conjunctions = {"and", "then", "et", "puis"}
+        # "don't shut down" must never route to terminate
+        self.negations = {"not", "don't", "dont", "no", "never", "ne", "n'", "pas", "jamais"}
+        self.intents = []  # [(action, kind, regex), ...]
+        self.aliases = []  # longest first, so "unity hub" wins over "unity"
+
+        aliases = {" ".join(tokenize(alias)) for data in apps.values() for alias in data["aliases"]}
+        for alias in sorted(aliases, key=len, reverse=True):
+            self.aliases.append((alias, re.compile(r"(?<!\S)" + re.escape(alias) + r"(?!\S)")))
+
+        for action, phrases in lang.get("intents", {}).items():
+            if action not in allowed_actions or action not in actions:
+                continue
+            if not actions[action]["function"]:
+                continue
+            prompt = actions[action]["prompt"]
+            if "<app_name>" in prompt:
+                kind = "app"
+            elif "<" in prompt:
+                kind = "text"
+            else:
+                kind = "none"
+            phrases = sorted((" ".join(tokenize(p)) for p in phrases), key=len, reverse=True)
+            regex = re.compile(r"(?<!\S)(?:" + "|".join(re.escape(p) for p in phrases) + r")(?!\S)")
+            self.intents.append((action, kind, regex))
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.route_time = 0.0
+        self.llm_time = 0.0
+
+    def strip(self, words):
+        return [w for w in words if w not in self.stopwords]
+
+    def route(self, text):
+        """
+        Retourne (action, params) si la commande est reconnue avec certitude, sinon None.
+        """
+        start = time.perf_counter()
+        intent = self.classify(text)
+        self.route_time += time.perf_counter() - start
+        return intent
+
+    def classify(self, text):
+        words = [w for w in tokenize(text) if w != self.hotword]
+        if not words or self.conjunctions.intersection(words):
+            return None
+        if self.negations.intersection(words) or any(w.startswith("n'") for w in words):
+            return None
+        text = " ".join(words)
+
+        found = []
+        for action, kind, regex in self.intents:
+            match = regex.search(text)
+            if match:
+                found.append((action, kind, match))
+        # Nothing or ambiguous: let the LLM decide
+        if len(found) != 1:
+            return None
+
+        action, kind, match = found[0]
+        before = self.strip(text[:match.start()].split())
+        rest = text[match.end():].strip()
+
+        if kind == "none":
+            # Nothing may be left over: "what day is tomorrow" isn't get_date
+            if before or self.strip(rest.split()):
+                return None
+            return action, ""
+
+        if before:
+            return None
+
+        if kind == "app":
+            for alias, alias_regex in self.aliases:
+                alias_match = alias_regex.search(rest)
+                if alias_match:
+                    leftover = rest[:alias_match.start()] + rest[alias_match.end():]
+                    if self.strip(leftover.split()):
+                        return None
+                    return action, alias
+            return None
+
+        # free text parameter
+        words = rest.split()
+        while words and words[0] in self.stopwords:
+            words.pop(0)
+        if not words:
+            return None
+        return action, " ".join(words)
+
+    def hit(self):
+        self.hits += 1
+
+    def miss(self, llm_time):
+        self.misses += 1
+        self.llm_time += llm_time
+
+    def report(self):
+        total = self.hits + self.misses
+        if not total:
+            return "router: no command yet"
+        rate = self.hits / total * 100
+        route_us = self.route_time / total * 1e6
+        saved = 0.0
+        if self.misses:
+            saved = self.hits * self.llm_time / self.misses
+        return f"router: {self.hits}/{total} hits ({rate:.0f}%), {route_us:.0f} µs per routing, ~{saved:.1f} s of LLM time saved"
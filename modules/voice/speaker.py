@@ -1,65 +1,171 @@
-import subprocess
 import configparser
 import json
 import os
 import sys
 import platform
+import threading
+import itertools
+import numpy as np
+import sounddevice as sd
+from .espeak import load_engine
+from .pipeline import PriorityBoundedQueue
+from .speech_cache import SpeechCache
 
 class Speaker():
     BASE_DIR = os.path.dirname(os.path.abspath(sys.argv[0]))
     config_path = os.path.join(BASE_DIR, "settings", "config.cfg")
 
-    config = configparser.ConfigParser()
-    config.read(config_path)
-
     lang_dir = os.path.join(BASE_DIR, "lang")
-    lang_file = os.path.join(lang_dir, f"{config.get('General', 'lang', fallback='en_US')}.json")
-    with open(lang_file, 'r', encoding='utf-8') as f:
-        lang = json.load(f)
-    
+
     system = platform.system()
 
-    def __init__(self, voice=lang["lang"], speed=130, pitch=50, volume=100, gap=0):
-        self.voice = voice
+    cache_dir = os.path.join(BASE_DIR, "cache", "speech")
+    # Fixed parts of the messages built by the action functions
+    TEMPLATE_KEYS = [
+        "app", "lauched", "closed", "not authorized", "process", "not found",
+        "launch error", "close error", "time", "day", "clicked", "goodbye",
+        "focused", "cant find window", "searching for", "no browser defined",
+        "non authorized action"
+    ]
+
+    # Priorities: lower is spoken first
+    URGENT = 0
+    NORMAL = 1
+
+    def __init__(self, voice=None, speed=130, pitch=50, volume=100, gap=0):
+        self.config = configparser.ConfigParser()
+        self.config.read(self.config_path)
+        lang_file = os.path.join(self.lang_dir, f"{self.config.get('General', 'lang', fallback='en_US')}.json")
+        with open(lang_file, 'r', encoding='utf-8') as f:
+            self.lang = json.load(f)
+        self.voice = voice or self.lang["lang"]
         self.speed = str(speed)
         self.pitch = str(pitch)
         self.volume = str(volume)
         self.gap = str(gap)
-        self.process = None  # to stock ongoing process
+        self.engine = None  # loaded by the worker, stays alive between messages
+        # (priority, order, generation, text, templated, utterance), a burst of answers
+        # can't pile up behind a slow voice: the oldest normal message is dropped first
+        size = self.config.getint("Voice", "speaker_queue", fallback=4)
+        self.queue = PriorityBoundedQueue("speaker", max(1, size), "drop_oldest")
+        self.order = itertools.count()
+        self.generation = 0  # bumped by stop(), older utterances are dropped
+        self.listeners = []  # callables (event, text, utterance) with event in "start", "end", "cancel"
+        self.speaking = None
+        self.worker = None
+        self.cache = None
+        if self.config.getboolean("Voice", "speech_cache", fallback=True):
+            size = self.config.getint("Voice", "speech_cache_mb", fallback=50) * 1024 * 1024
+            self.cache = SpeechCache(self.cache_dir, max_size=size)
+        phrases = {self.lang[k].strip(" .").lower() for k in self.TEMPLATE_KEYS if self.lang.get(k)}
+        self.templates = sorted(phrases, key=len, reverse=True)
 
-    def say(self, text):
-        # If a process in ongoing, wait for it to finish
-        if self.process and self.process.poll() is None:
-            self.process.wait()
-        if self.system == "Linux":
-            cmd = [
-                "espeak-ng",
-                "-v", self.voice,
-                "-s", self.speed,
-                "-p", self.pitch,
-                "-a", self.volume,
-                "-g", self.gap,
-                text
-            ]
-        else:
-            cmd = [
-                "C://Program Files/eSpeak NG/espeak-ng.exe",
-                "-v", self.voice,
-                "-s", self.speed,
-                "-p", self.pitch,
-                "-a", self.volume,
-                "-g", self.gap,
-                text
-            ]
+    def say(self, text, priority=NORMAL, generation=None, templated=False, utterance=None):
+        # Queue the text and return at once, the worker speaks it in order.
+        # A generation pinned by the caller makes the text stale after the next stop().
+        # templated: message built by an action function, its lang parts come from the cache.
+        # utterance: id of the command this answers, handed back to the listeners
+        if not text or not text.strip():
+            return
+        if generation is None:
+            generation = self.generation
+        self.queue.put((priority, next(self.order), generation, text, templated, utterance))
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self.run, daemon=True)
+            self.worker.start()
+
+    def emit(self, event, text, utterance=None):
+        for listener in self.listeners:
+            try:
+                listener(event, text, utterance)
+            except Exception as e:
+                print(e)
 
-        self.process = subprocess.Popen(cmd)
+    def run(self):
+        if self.engine is None:
+            self.engine = load_engine()
+        while True:
+            _, _, generation, text, templated, utterance = self.queue.get()
+            if generation != self.generation:
+                continue
+            self.speak(text, generation, templated, utterance)
+
+    def split(self, text):
+        """
+        Découpe un message en [(partie, fixe), ...] : préfixe et suffixe connus
+        (textes de lang) d'un côté, partie variable de l'autre.
+        """
+        rest = text.strip().rstrip(".")
+        prefix = suffix = None
+        for phrase in self.templates:
+            if prefix is None and rest.lower().startswith(phrase) and rest[len(phrase):len(phrase) + 1] in ("", " "):
+                prefix = rest[:len(phrase)]
+                rest = rest[len(phrase):].strip()
+            if suffix is None and rest.lower().endswith(phrase) and rest[:-len(phrase)][-1:] in ("", " "):
+                suffix = rest[len(rest) - len(phrase):]
+                rest = rest[:-len(phrase)].strip()
+        if prefix is None and suffix is None:
+            return [(text, False)]
+        parts = []
+        if prefix:
+            parts.append((prefix, True))
+        if rest:
+            parts.append((rest, False))
+        if suffix:
+            parts.append((suffix, True))
+        return parts
+
+    def synth(self, text, fixed):
+        key = None
+        if self.cache and fixed:
+            key = self.cache.key(self.voice, self.speed, self.pitch, self.volume, self.gap, text)
+            cached = self.cache.get(key)
+            if cached:
+                return cached
+        pcm, samplerate = self.engine.synth(text, self.voice, self.speed, self.pitch, self.volume, self.gap)
+        if key and pcm:
+            self.cache.put(key, pcm, samplerate)
+        return pcm, samplerate
+
+    def render(self, text, templated=False):
+        pcm = b""
+        samplerate = None
+        # Free LLM text is never spliced from cached parts
+        parts = self.split(text) if templated else [(text, False)]
+        for part, fixed in parts:
+            part_pcm, part_rate = self.synth(part, fixed)
+            if not part_pcm:
+                return None, samplerate
+            if samplerate and part_rate != samplerate:
+                # Cache made with another engine, don't mix rates
+                return self.engine.synth(text, self.voice, self.speed, self.pitch, self.volume, self.gap)
+            samplerate = part_rate
+            pcm += part_pcm
+        return pcm, samplerate
+
+    def speak(self, text, generation, templated=False, utterance=None):
+        pcm, samplerate = self.render(text, templated)
+        if not pcm or generation != self.generation:
+            self.emit("cancel", text, utterance)
+            return
+        self.speaking = text
+        self.emit("start", text, utterance)
+        try:
+            sd.play(np.frombuffer(pcm, dtype=np.int16), samplerate)
+            sd.wait()
+        except Exception as e:
+            print(e)
+        self.speaking = None
+        if generation != self.generation:
+            self.emit("cancel", text, utterance)
+        else:
+            self.emit("end", text, utterance)
 
     def stop(self):
-        if self.process and self.process.poll() is None:
-            # process still active
-            self.process.terminate()
-            try:
-                self.process.wait(timeout=1) 
-            except subprocess.TimeoutExpired:
-                self.process.kill()
-        self.process = None
+        # Barge-in: drop pending messages and cut the current one
+        self.generation += 1
+        self.queue.clear()
+        if self.engine:
+            self.engine.cancel()
+        if self.speaking is not None:
+            sd.stop()
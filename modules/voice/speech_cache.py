@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+import wave
+from collections import OrderedDict
+
+
+class SpeechCache():
+    """
+    Cache disque LRU de l'audio synthétisé, borné en taille.
+    La clé couvre la voix, les réglages et le texte.
+    """
+
+    def __init__(self, folder, max_size=50 * 1024 * 1024):
+        self.folder = folder
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()  # key -> size, least recently used first
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+        files = []
+        for filename in os.listdir(folder):
+            if filename.endswith(".wav"):
+                stat = os.stat(os.path.join(folder, filename))
+                files.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.size += size
+
+    @staticmethod
+    def key(voice, speed, pitch, volume, gap, text):
+        raw = "\0".join(str(v) for v in (voice, speed, pitch, volume, gap, text))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.folder, f"{key}.wav")
+
+    def get(self, key):
+        """
+        Retourne (pcm, samplerate) ou None.
+        """
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        path = self.path(key)
+        try:
+            with wave.open(path, "rb") as wav:
+                pcm = wav.readframes(wav.getnframes())
+                samplerate = wav.getframerate()
+            os.utime(path)
+            return pcm, samplerate
+        except (OSError, wave.Error, EOFError):
+            self.remove(key)
+            return None
+
+    def put(self, key, pcm, samplerate):
+        path = self.path(key)
+        try:
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(samplerate)
+                wav.writeframes(pcm)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(e)
+            return
+        with self.lock:
+            self.size -= self.entries.pop(key, 0)
+            self.entries[key] = size
+            self.size += size
+        self.evict()
+
+    def remove(self, key):
+        with self.lock:
+            self.size -= self.entries.pop(key, 0)
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        while True:
+            with self.lock:
+                if self.size <= self.max_size or len(self.entries) <= 1:
+                    return
+                key = next(iter(self.entries))
+            self.remove(key)
@@ -0,0 +1,101 @@
+import json
+
+
+class Action():
+    def __init__(self, name, params=""):
+        self.name = name
+        self.params = params
+
+    def __repr__(self):
+        return f"Action({self.name!r}, {self.params!r})"
+
+
+class StructuredReply():
+    """
+    Mode de réponse JSON : Ollama est contraint par un schéma généré depuis
+    actions.json, la réponse est lue en une passe en actions typées
+    validées contre les actions autorisées.
+    """
+
+    def __init__(self, actions, allowed_actions):
+        self.actions = actions
+        self.allowed = [a for a in allowed_actions if a in actions]
+
+    def schema(self):
+        return {
+            "type": "object",
+            "properties": {
+                "say": {"type": "string"},
+                "actions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "action": {"type": "string", "enum": self.allowed},
+                            "params": {"type": "string"}
+                        },
+                        "required": ["action", "params"]
+                    }
+                }
+            },
+            "required": ["say", "actions"]
+        }
+
+    def instructions(self):
+        return (
+            'Always reply with a JSON object {"say": ..., "actions": [...]}.\n'
+            'Put each ACTION you would answer in "actions" as {"action": "<action>", "params": "<parameters as one string>"}, '
+            'in the order they must run, and leave "say" empty when you only run actions.\n'
+            'Put everything else you want to tell the user in "say".\n'
+        )
+
+    def parse(self, text):
+        """
+        Retourne (texte à dire, [Action], actions refusées), ou None si la réponse n'est pas du JSON attendu.
+        """
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        say = data.get("say") or ""
+        items = data.get("actions") or []
+        if not isinstance(say, str) or not isinstance(items, list):
+            return None
+        actions, refused = [], []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            name = str(item.get("action", "")).strip()
+            params = item.get("params", "")
+            if isinstance(params, list):
+                params = " ".join(str(p) for p in params)
+            params = str(params or "").strip()
+            if name in self.allowed:
+                actions.append(Action(name, params))
+            else:
+                refused.append(Action(name, params))
+        return say.strip(), actions, refused
+
+    def batch(self, actions):
+        """
+        Fusionne les actions "batch" qui se suivent (ex : plusieurs press) en un seul appel.
+        """
+        merged = []
+        for action in actions:
+            batch = self.actions.get(action.name, {}).get("batch", False)
+            if batch and merged and merged[-1].name == action.name and action.params:
+                merged[-1] = Action(action.name, f"{merged[-1].params} {action.params}".strip())
+            else:
+                merged.append(action)
+        return merged
+
+    @staticmethod
+    def cacheable(text):
+        # Only action replies are deterministic enough to be cached
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and not data.get("say") and bool(data.get("actions"))
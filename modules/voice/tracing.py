@@ -0,0 +1,159 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class Tracer():
+    """
+    Étapes de chaque commande vocale (audio, Vosk, Ollama, actions, synthèse)
+    écrites au format Chrome trace (chrome://tracing, ui.perfetto.dev)
+    et gardées en mémoire pour un résumé p50/p95 glissant.
+    Un nouveau fichier commence tous les max_bytes, seuls les keep derniers sont gardés.
+    """
+
+    # One row per stage in the trace viewer
+    LANES = ["audio", "recognition", "brain", "llm", "actions", "speaker"]
+
+    def __init__(self, window=200):
+        self.enabled = False
+        self.window = window
+        self.ids = itertools.count(1)
+        self.current = None  # utterance handled by the brain right now
+        self.origins = {}  # utterance -> time its last audio block arrived
+        self.spoken = set()  # utterances already heard by the user
+        self.samples = {}  # span name -> recent durations (ms)
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.worker = None
+        self.folder = None
+        self.max_bytes = 10 * 1024 * 1024
+        self.keep = 5
+
+    def start(self, folder, window=200, max_bytes=10 * 1024 * 1024, keep=5):
+        """
+        Active le traçage, les événements vont dans des fichiers de folder.
+        """
+        with self.lock:
+            self.window = window
+            self.max_bytes = max_bytes
+            self.keep = keep
+            if self.enabled:
+                return
+            os.makedirs(folder, exist_ok=True)
+            self.folder = folder
+            self.enabled = True
+            self.worker = threading.Thread(target=self.run, daemon=True)
+            self.worker.start()
+
+    def begin(self, origin, text=""):
+        """
+        Nouvelle commande, origin est l'arrivée (perf_counter) du bloc audio qui l'a terminée.
+        """
+        utterance = next(self.ids)
+        with self.lock:
+            self.origins[utterance] = origin
+            # Only the last few utterances can still be spoken
+            for old in [u for u in self.origins if u < utterance - 16]:
+                self.origins.pop(old, None)
+                self.spoken.discard(old)
+        self.instant("utterance", "recognition", utterance, text=text)
+        return utterance
+
+    def span(self, name, lane, utterance, start, end=None, **args):
+        if not self.enabled or utterance is None:
+            return
+        end = time.perf_counter() if end is None else end
+        duration = (end - start) * 1000
+        with self.lock:
+            self.samples.setdefault(name, deque(maxlen=self.window)).append(duration)
+        self.queue.put({
+            "name": name, "cat": lane, "ph": "X",
+            "ts": round(start * 1e6), "dur": round(duration * 1000),
+            "pid": os.getpid(), "tid": self.LANES.index(lane),
+            "args": dict(args, utterance=utterance)
+        })
+
+    def instant(self, name, lane, utterance, **args):
+        if not self.enabled or utterance is None:
+            return
+        self.queue.put({
+            "name": name, "cat": lane, "ph": "i", "s": "t",
+            "ts": round(time.perf_counter() * 1e6),
+            "pid": os.getpid(), "tid": self.LANES.index(lane),
+            "args": dict(args, utterance=utterance)
+        })
+
+    def heard(self, utterance, start):
+        """
+        Le premier son de la réponse sort : temps total depuis la fin de la commande.
+        """
+        with self.lock:
+            origin = self.origins.get(utterance)
+            if origin is None or utterance in self.spoken:
+                return
+            self.spoken.add(utterance)
+        self.span("end to end", "speaker", utterance, origin, start)
+
+    def open_file(self):
+        # Oldest traces go first, so the folder never grows past keep files
+        files = sorted(f for f in os.listdir(self.folder) if f.startswith("trace-") and f.endswith(".json"))
+        for old in files[:max(0, len(files) - self.keep + 1)]:
+            try:
+                os.remove(os.path.join(self.folder, old))
+            except OSError:
+                pass
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        f = open(os.path.join(self.folder, f"trace-{stamp}.json"), 'w', encoding='utf-8')
+        # JSON array format: the closing bracket is optional, the file stays readable while written
+        f.write("[\n")
+        for lane in self.LANES:
+            f.write(json.dumps({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self.LANES.index(lane), "args": {"name": lane}}) + ",\n")
+        f.flush()
+        return f
+
+    def run(self):
+        f = self.open_file()
+        while True:
+            events = [self.queue.get()]
+            while True:
+                try:
+                    events.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                f.write("".join(json.dumps(e, ensure_ascii=False) + ",\n" for e in events))
+                f.flush()
+                if f.tell() >= self.max_bytes:
+                    f.close()
+                    f = self.open_file()
+            except OSError as e:
+                print(e)
+
+    @staticmethod
+    def percentile(values, p):
+        values = sorted(values)
+        index = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+        return values[index]
+
+    def summary(self):
+        """
+        p50 / p95 de chaque étape sur les dernières commandes, None si rien n'a été mesuré.
+        """
+        with self.lock:
+            samples = {name: list(values) for name, values in self.samples.items() if values}
+        if not samples:
+            return None
+        width = max(len(name) for name in samples)
+        lines = [f"{'span':<{width}}    p50 ms    p95 ms      n"]
+        for name in sorted(samples):
+            values = samples[name]
+            lines.append(f"{name:<{width}}  {self.percentile(values, 50):>8.0f}  {self.percentile(values, 95):>8.0f}  {len(values):>5}")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import configparser
+from contextlib import nullcontext
+from PySide6.QtCore import QThread, Signal, Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton
+from PySide6.QtGui import QFont
+from .tracing import tracer
+import __main__
+
+
+def resource_path(relative_path: str) -> str:
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.dirname(os.path.abspath(getattr(__main__, '__file__', sys.argv[0])))
+    return os.path.join(base_path, relative_path)
+
+
+config_path = resource_path("settings/config.cfg")
+lang_dir = resource_path("lang")
+
+
+def load_audio():
+    import sounddevice
+    import vosk
+
+def load_brain():
+    from . import brain
+
+def load_listener():
+    from . import listener
+
+def load_vosk():
+    # The model stays in memory, starting to listen won't load it again
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    model_path = config.get("Voice", "vosk", fallback=False)
+    if config.getboolean("Voice", "vosk_preload", fallback=True) and model_path and os.path.exists(model_path):
+        from .models import vosk_models
+        vosk_models.load(model_path)
+
+
+class LoaderThread(QThread):
+    """
+    Importe les modules lourds (audio, Ollama, fonctions) une fois la fenêtre affichée.
+    """
+    log_signal = Signal(str)
+    finished_signal = Signal(bool)
+
+    STAGES = [
+        ("stage audio", load_audio),
+        ("stage brain", load_brain),
+        ("stage listener", load_listener),
+        ("stage vosk", load_vosk),
+    ]
+
+    def __init__(self, lang, profiler=None):
+        super().__init__()
+        self.lang = lang
+        self.profiler = profiler
+
+    def run(self):
+        success = True
+        for key, load in self.STAGES:
+            self.log_signal.emit(f"⏳ {self.lang['loading']} {self.lang[key]}...")
+            start = time.perf_counter()
+            try:
+                with self.profiler.stage(key) if self.profiler else nullcontext():
+                    load()
+                self.log_signal.emit(f"✅ {self.lang[key]} ({time.perf_counter() - start:.1f} s)")
+            except Exception as e:
+                self.log_signal.emit(f"❌ {self.lang[key]} : {e}")
+                success = False
+        self.finished_signal.emit(success)
+
+
+class ListenerUI(QWidget):
+
+    def __init__(self):
+        super().__init__()
+
+        self.config = configparser.ConfigParser()
+        self.config.read(config_path)
+        self.lang = {}
+        self.load_language()
+
+        layout = QVBoxLayout()
+        self.resize(600, 800)
+
+
+        self.label = QLabel(f"<h2>{self.lang['listener title']}</h2>")
+        self.label.setAccessibleDescription(self.lang["listener title"])
+        self.label.setFocusPolicy(Qt.StrongFocus)
+        layout.addWidget(self.label)
+
+        self.log = QTextEdit()
+        self.log.setReadOnly(True)
+        self.log.setAccessibleName(self.lang["text logs"])
+        self.log.setFocusPolicy(Qt.StrongFocus)
+        layout.addWidget(self.log)
+
+        self.start_button = QPushButton(self.lang["start listening"])
+        self.start_button.setAccessibleDescription(self.lang["start listening"])
+        self.start_button.clicked.connect(self.start_listening)
+        self.start_button.setFocusPolicy(Qt.StrongFocus)
+        layout.addWidget(self.start_button)
+
+        self.stop_button = QPushButton(self.lang["stop listening"])
+        self.stop_button.setAccessibleDescription(self.lang["stop listening"])
+        self.stop_button.clicked.connect(self.stop_listening)
+        self.stop_button.setFocusPolicy(Qt.StrongFocus)
+        layout.addWidget(self.stop_button)
+
+        self.latency_button = QPushButton(self.lang["latency"])
+        self.latency_button.setAccessibleDescription(self.lang["latency"])
+        self.latency_button.clicked.connect(self.show_latency)
+        self.latency_button.setFocusPolicy(Qt.StrongFocus)
+        layout.addWidget(self.latency_button)
+
+        self.setLayout(layout)
+
+        self.listener_thread = None
+        self.loader = None
+
+        # Style
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #000000;
+                color: #FFFF00;
+                font-family: Arial, sans-serif;
+            }
+            QLabel {
+                padding: 15px;
+            }
+            QLabel:focus {
+                border: 4px solid #FFA500;
+                outline: none;
+            }
+            QPushButton {
+                background-color: #0000FF;
+                color: #FFFFFF;
+                border: 3px solid #FFFFFF;
+                border-radius: 8px;
+                padding: 15px;
+            }
+            QPushButton:focus {
+                border: 4px solid #FFA500;
+            }
+            QPushButton:hover {
+                background-color: #1E90FF;
+            }
+            QTextEdit {
+                background-color: #111111;
+                color: #00FF00;
+                border: 2px solid #FFFFFF;
+            }
+            QTextEdit:focus {
+                border: 4px solid #FFA500;
+            }
+        """)
+
+    def load_language(self):
+        lang_code = self.config.get("General", "lang", fallback="en_US")
+        lang_file = os.path.join(lang_dir, f"{lang_code}.json")
+        with open(lang_file, "r", encoding="utf-8") as f:
+            self.lang = json.load(f)
+
+    def preload(self, profiler=None, on_loaded=None):
+        """
+        Lance le chargement en arrière-plan, le bouton de démarrage attend sa fin.
+        on_loaded(succès) est appelé une fois le chargement terminé.
+        """
+        self.start_button.setEnabled(False)
+        self.loader = LoaderThread(self.lang, profiler)
+        self.loader.log_signal.connect(self.append_log)
+        self.loader.finished_signal.connect(self.on_loaded)
+        if on_loaded:
+            # Connected before start(), a fast failure can't be missed
+            self.loader.finished_signal.connect(on_loaded)
+        self.loader.start()
+
+    def on_loaded(self, success):
+        self.start_button.setEnabled(True)
+        if success:
+            self.append_log(self.lang["loaded"])
+
+    def append_log(self, message):
+        self.log.append(message)
+        self.log.ensureCursorVisible()
+        self.log.verticalScrollBar().setValue(self.log.verticalScrollBar().maximum())
+
+    def start_listening(self):
+        self.start_button.setEnabled(False)
+        self.log.clear()
+        self.append_log(self.lang["starting"])
+
+        from .listener import ListenerThread
+        self.listener_thread = ListenerThread(self.lang)
+        self.listener_thread.log_signal.connect(self.append_log)
+        self.listener_thread.finished_signal.connect(self.on_listening_finished)
+        self.listener_thread.start()
+
+    def stop_listening(self):
+        if self.listener_thread and self.listener_thread.isRunning():
+            self.listener_thread.brain.cancel = True
+            self.listener_thread.speaker.stop()
+            self.listener_thread.wait()
+            self.start_button.setEnabled(True)
+
+    def show_latency(self):
+        summary = tracer.summary()
+        self.append_log(f"<pre>{summary}</pre>" if summary else self.lang["no trace"])
+        # Queues and caches of the running listener
+        if self.listener_thread and hasattr(self.listener_thread, "commands"):
+            self.append_log(f"<pre>{self.listener_thread.metrics()}</pre>")
+
+    def closeEvent(self, event):
+        if self.loader and self.loader.isRunning():
+            self.loader.wait()
+        self.stop_listening()
+
+    def on_listening_finished(self, success):
+        self.start_button.setEnabled(True)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        size = self.height() // 15
+        font = QFont("Arial", size)
+        if not font.exactMatch():
+            font = QFont("Sans Serif", size)
+        self.label.setFont(font)
+        self.log.setFont(font)
+        self.start_button.setFont(font)
+        self.stop_button.setFont(font)
+        self.latency_button.setFont(font)
@@ -0,0 +1,83 @@
+"""
+Profil du démarrage d'Athena (python main.py --profile-startup) :
+temps de chaque étape et des imports les plus lents.
+"""
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler():
+
+    def __init__(self):
+        self.enabled = False
+        self.start = time.perf_counter()
+        self.stages = []  # (name, thread, start, duration)
+        self.imports = {}  # module -> (depth, inclusive time)
+        self.marks = []  # (name, time since start)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.original_import = builtins.__import__
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        builtins.__import__ = self.timed_import
+
+    def disable(self):
+        if self.enabled:
+            builtins.__import__ = self.original_import
+            self.enabled = False
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level and globals:
+            try:
+                module = importlib.util.resolve_name("." * level + name, globals.get("__package__"))
+            except (ImportError, ValueError):
+                pass
+        if module in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        depth = getattr(self.local, "depth", 0)
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self.local.depth = depth
+            with self.lock:
+                self.imports.setdefault(module, (depth, time.perf_counter() - start))
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.stages.append((name, threading.current_thread().name, start - self.start, time.perf_counter() - start))
+
+    def mark(self, name):
+        with self.lock:
+            self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self, top=20):
+        lines = ["stage                          thread          start      time"]
+        for name, thread, start, duration in self.stages:
+            lines.append(f"{name:<30} {thread[:14]:<14} {start * 1000:>7.0f} ms {duration * 1000:>7.0f} ms")
+        for name, at in self.marks:
+            lines.append(f"{name:<30} {'':<14} {at * 1000:>7.0f} ms")
+        lines.append("")
+        lines.append(f"slowest imports (of {len(self.imports)}, inclusive)")
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        for module, (depth, duration) in slowest:
+            lines.append(f"{duration * 1000:>7.0f} ms  {'  ' * min(depth, 4)}{module}")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()